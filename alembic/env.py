@@ -0,0 +1,12 @@
+from alembic import context
+
+from database import engine
+from models import Base
+
+target_metadata = Base.metadata
+
+# Migrations inspect the live schema, so there is no offline (--sql) mode
+with engine.connect() as connection:
+    context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
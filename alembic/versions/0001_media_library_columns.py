@@ -0,0 +1,66 @@
+"""Media library columns and indexes on media_assets
+
+media_assets was first created with only the upload bookkeeping columns;
+the media library added dimensions, duration, a 64-bit size and per-type
+indexes. Databases created by create_all since then already have them, so
+every step checks first.
+
+Revision ID: 0001_media_library_columns
+Revises:
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_media_library_columns"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+NEW_COLUMNS = [
+    ("width", sa.Integer()),
+    ("height", sa.Integer()),
+    ("duration", sa.Float()),
+]
+
+NEW_INDEXES = [
+    ("uq_media_assets_type_filename", ["file_type", "filename"], True),
+    ("ix_media_assets_type_created", ["file_type", "created_at"], False),
+    ("ix_media_assets_type_size", ["file_type", "size"], False),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("media_assets"):
+        return  # Created with the current schema by create_all
+    
+    columns = {column["name"]: column for column in inspector.get_columns("media_assets")}
+    existing = {index["name"] for index in inspector.get_indexes("media_assets")}
+    existing |= {constraint["name"] for constraint in inspector.get_unique_constraints("media_assets")}
+    
+    for name, type_ in NEW_COLUMNS:
+        if name not in columns:
+            op.add_column("media_assets", sa.Column(name, type_))
+    
+    # SQLite integers are already 64-bit
+    if op.get_bind().dialect.name != "sqlite" and not isinstance(columns["size"]["type"], sa.BigInteger):
+        op.alter_column("media_assets", "size", type_=sa.BigInteger(), existing_type=sa.Integer())
+    
+    for name, columns_, unique in NEW_INDEXES:
+        if name not in existing:
+            op.create_index(name, "media_assets", columns_, unique=unique)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    existing = {index["name"] for index in inspector.get_indexes("media_assets")}
+    for name, _, _ in reversed(NEW_INDEXES):
+        if name in existing:
+            op.drop_index(name, table_name="media_assets")
+    with op.batch_alter_table("media_assets") as batch:
+        for name, _ in reversed(NEW_COLUMNS):
+            batch.drop_column(name)
+        if op.get_bind().dialect.name != "sqlite":
+            batch.alter_column("size", type_=sa.Integer(), existing_type=sa.BigInteger())
@@ -1,9 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
+import asyncio
+import hashlib
+import threading
+import time
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 from database import get_db
 from models import Admin as AdminModel
@@ -17,9 +24,21 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 1440))
 
+# Resolved admins are cached briefly so admin requests skip the auth query
+ADMIN_CACHE_TTL_SECONDS = float(os.getenv("ADMIN_CACHE_TTL_SECONDS", 60))
+ADMIN_CACHE_MAX_SIZE = 1024
+
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt runs in its own small pool so logins never block the event loop.
+# Calls beyond workers + queue are refused rather than piling up.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 16))
+PASSWORD_HASH_RETRY_AFTER = 1
+_password_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_password_hash_pending = 0
+
 # Security scheme
 security = HTTPBearer()
 
@@ -31,6 +50,29 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+async def _run_password_hash(func, *args):
+    """Run a bcrypt call in the password hashing pool, or refuse with 503 when it is saturated"""
+    global _password_hash_pending
+    if _password_hash_pending >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress, please retry shortly",
+            headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER)},
+        )
+    _password_hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_password_hash_executor, func, *args)
+    finally:
+        _password_hash_pending -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password without blocking the event loop"""
+    return await _run_password_hash(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    return await _run_password_hash(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
     to_encode = data.copy()
@@ -43,41 +85,149 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str):
-    """Verify JWT token"""
+@dataclass(frozen=True)
+class AuthenticatedAdmin:
+    """Detached snapshot of an admin, safe to share between requests"""
+    id: int
+    username: str
+    email: str
+    is_active: bool
+    is_superuser: bool
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_model(cls, admin: AdminModel):
+        return cls(
+            id=admin.id,
+            username=admin.username,
+            email=admin.email,
+            is_active=admin.is_active,
+            is_superuser=admin.is_superuser,
+            created_at=admin.created_at,
+        )
+
+_admin_cache = {}
+_admin_cache_lock = threading.Lock()
+
+def token_version(admin: AdminModel) -> str:
+    """Version claim for an admin's tokens; changes whenever the password does"""
+    return hashlib.sha256((admin.hashed_password or "").encode()).hexdigest()[:16]
+
+def invalidate_admin_cache(admin_id: int):
+    """Drop cached identities of an admin, e.g. after a rename, deactivation or password change"""
+    with _admin_cache_lock:
+        for key in [key for key, (_, admin) in _admin_cache.items() if admin.id == admin_id]:
+            del _admin_cache[key]
+
+def _cache_admin(key, admin: AuthenticatedAdmin):
+    with _admin_cache_lock:
+        if len(_admin_cache) >= ADMIN_CACHE_MAX_SIZE:
+            # Evict the entry closest to expiry
+            del _admin_cache[min(_admin_cache, key=lambda k: _admin_cache[k][0])]
+        _admin_cache[key] = (time.monotonic() + ADMIN_CACHE_TTL_SECONDS, admin)
+
+def _cached_admin(key) -> Optional[AuthenticatedAdmin]:
+    entry = _admin_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, admin = entry
+    if expires_at < time.monotonic():
+        with _admin_cache_lock:
+            _admin_cache.pop(key, None)
+        return None
+    return admin
+
+@event.listens_for(AdminModel, "after_update")
+@event.listens_for(AdminModel, "after_delete")
+def _invalidate_on_admin_change(mapper, connection, target):
+    invalidate_admin_cache(target.id)
+
+def create_admin_access_token(admin: AdminModel) -> str:
+    """Create an access token carrying the admin's id, status and token version"""
+    return create_access_token(data={
+        "sub": admin.username,
+        "aid": admin.id,
+        "act": admin.is_active,
+        "ver": token_version(admin),
+    })
+
+def decode_token(token: str) -> dict:
+    """Decode a JWT and return its claims"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        return username
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if payload.get("sub") is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
+def verify_token(token: str):
+    """Verify JWT token"""
+    return decode_token(token)["sub"]
 
 def get_current_admin(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-):
-    """Get current authenticated admin"""
-    token = credentials.credentials
-    username = verify_token(token)
+) -> AuthenticatedAdmin:
+    """Get current authenticated admin
     
-    admin = db.query(AdminModel).filter(AdminModel.username == username).first()
-    if admin is None:
+    Returns a detached AuthenticatedAdmin snapshot, not an Admin row; query
+    the row by its id to change it.
+    
+    Resolved admins are cached for ADMIN_CACHE_TTL_SECONDS, keyed by
+    admin id (username for tokens without one) and token version, so most
+    admin requests need no query.
+    """
+    payload = decode_token(credentials.credentials)
+    username = payload["sub"]
+    version = payload.get("ver")
+    
+    if payload.get("act") is False:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Admin not found",
-            headers={"WWW-Authenticate": "Bearer"},
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive admin"
         )
     
+    cache_key = (("aid", payload["aid"]) if payload.get("aid") is not None else ("sub", username), version)
+    admin = _cached_admin(cache_key)
+    # A token issued under an admin's previous username is no longer valid
+    if admin is not None and admin.username != username:
+        admin = None
+    if admin is None:
+        query = db.query(AdminModel)
+        if payload.get("aid") is not None:
+            db_admin = query.filter(AdminModel.id == payload["aid"]).first()
+            if db_admin is not None and db_admin.username != username:
+                db_admin = None
+        else:
+            db_admin = query.filter(AdminModel.username == username).first()
+        
+        if db_admin is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Admin not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        # Tokens issued before a password change are no longer valid
+        if version is not None and version != token_version(db_admin):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        admin = AuthenticatedAdmin.from_model(db_admin)
+        _cache_admin(cache_key, admin)
+    
     if not admin.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -93,4 +243,13 @@ def authenticate_admin(db: Session, username: str, password: str):
         return False
     if not verify_password(password, admin.hashed_password):
         return False
-    return admin
\ No newline at end of file
+    return admin
+
+async def authenticate_admin_async(db: Session, username: str, password: str):
+    """Authenticate admin, verifying the password in the hashing pool"""
+    admin = db.query(AdminModel).filter(AdminModel.username == username).first()
+    if not admin:
+        return False
+    if not await verify_password_async(password, admin.hashed_password):
+        return False
+    return admin
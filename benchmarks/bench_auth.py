@@ -0,0 +1,19 @@
+"""
+JWT encoding and decoding for admin tokens.
+
+    pytest benchmarks/bench_auth.py
+"""
+
+from benchmarks.support import NOW  # noqa: F401  (sets up the environment)
+from auth import create_access_token, decode_token
+
+
+def test_create_access_token(benchmark):
+    token = benchmark(create_access_token, {"sub": "admin", "aid": 1, "act": True, "ver": "0123456789abcdef"})
+    assert token.count(".") == 2
+
+
+def test_decode_token(benchmark):
+    token = create_access_token({"sub": "admin", "aid": 1, "act": True, "ver": "0123456789abcdef"})
+    payload = benchmark(decode_token, token)
+    assert payload["sub"] == "admin"
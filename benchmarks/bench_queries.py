@@ -0,0 +1,34 @@
+"""
+Dashboard aggregation queries on a seeded database.
+
+    pytest benchmarks/bench_queries.py
+"""
+
+import asyncio
+
+import pytest
+
+from benchmarks.support import seed_database
+from routes import get_dashboard_stats
+
+ORDERS = 5000
+
+
+@pytest.fixture(scope="module")
+def db():
+    SessionLocal = seed_database(orders=ORDERS)
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.mark.parametrize("recent_view", ["full", "summary"])
+def test_dashboard_stats(benchmark, db, recent_view):
+    loop = asyncio.new_event_loop()
+    try:
+        stats = benchmark(lambda: loop.run_until_complete(
+            get_dashboard_stats(recent_view=recent_view, db=db, current_admin=None)
+        ))
+    finally:
+        loop.close()
+    assert stats.total_orders == ORDERS
@@ -0,0 +1,24 @@
+"""
+Serialization of nested order lists, as GET /api/orders/ does it.
+
+    pytest benchmarks/bench_serialization.py
+"""
+
+import pytest
+
+from benchmarks.support import make_orders
+from routes import order_list_adapter
+
+
+@pytest.mark.parametrize("count", [100, 1000])
+def test_order_list_dump_json(benchmark, count):
+    orders = make_orders(count)
+    body = benchmark(lambda: order_list_adapter.dump_json(order_list_adapter.validate_python(orders, from_attributes=True)))
+    assert body.startswith(b"[{")
+
+
+@pytest.mark.parametrize("count", [100, 1000])
+def test_order_list_validate(benchmark, count):
+    orders = make_orders(count)
+    validated = benchmark(order_list_adapter.validate_python, orders, from_attributes=True)
+    assert len(validated) == count
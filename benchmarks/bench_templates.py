@@ -0,0 +1,47 @@
+"""
+Notification rendering: the Jinja email templates and Telegram messages.
+
+    pytest benchmarks/bench_templates.py
+"""
+
+from pathlib import Path
+
+import pytest
+
+from benchmarks.support import sample_order_data
+from services.email_service import EmailService
+from services.telegram_service import TelegramService
+
+TEMPLATES = sorted(path.name for path in (Path(__file__).resolve().parent.parent / "email").glob("*.html"))
+
+email_service = EmailService()
+telegram_service = TelegramService()
+
+
+@pytest.mark.parametrize("template_name", TEMPLATES)
+def test_render_email_template(benchmark, template_name):
+    order_data, customer_data = sample_order_data()
+    template = email_service.env.get_template(template_name)
+    html = benchmark(template.render, order=order_data, customer=customer_data, status_label="Confirmed")
+    assert customer_data["full_name"] in html
+
+
+def test_render_email_message(benchmark):
+    order_data, customer_data = sample_order_data()
+    message = benchmark(
+        email_service.render_message, "customer_order_status_update.html", customer_data["email"],
+        "Order #42 Status Updated - Confirmed", order=order_data, customer=customer_data, status_label="Confirmed"
+    )
+    assert message["To"] == customer_data["email"]
+
+
+def test_format_telegram_order_message(benchmark):
+    order_data, customer_data = sample_order_data()
+    message = benchmark(telegram_service._format_order_message, order_data, customer_data)
+    assert "#42" in message
+
+
+def test_format_telegram_status_update_message(benchmark):
+    order_data, customer_data = sample_order_data()
+    message = benchmark(telegram_service._format_status_update_message, order_data, customer_data)
+    assert "#42" in message
@@ -0,0 +1,204 @@
+"""
+Local stand-ins for OpenRouter, Telegram and SMTP, used by the load tests.
+
+Each fake answers like the real service after a configurable delay and
+fails a configurable fraction of requests, so benchmarks measure this app
+rather than third parties, and can exercise its retry and error paths.
+"""
+
+from dataclasses import dataclass
+import asyncio
+import random
+import socket
+import threading
+import time
+import warnings
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+import uvicorn
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+# aiosmtpd warns about its own use of a deprecated attribute on every login
+warnings.filterwarnings("ignore", message="Session.login_data is deprecated")
+
+
+@dataclass
+class FaultProfile:
+    """Latency and error injection for one fake service"""
+    latency_ms: float = 0
+    jitter_ms: float = 0
+    error_rate: float = 0
+    error_status: int = 500
+    seed: int = 0
+
+    def __post_init__(self):
+        self._random = random.Random(self.seed)
+
+    def delay(self) -> float:
+        jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def should_fail(self) -> bool:
+        return self._random.random() < self.error_rate
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class _HttpFake:
+    """A FastAPI app served by uvicorn on a background thread"""
+
+    def __init__(self, app: FastAPI):
+        self.port = free_port()
+        self.requests = 0
+        self.failures = 0
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning", access_log=False)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{type(self).__name__} did not start")
+            time.sleep(0.01)
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+class FakeOpenRouter(_HttpFake):
+    """Answers /chat/completions with a canned reply"""
+
+    reply = "SmartTech Interactive Smart Board RK3588. Contact 01678-134547 for pricing."
+
+    def __init__(self, profile: FaultProfile):
+        self.profile = profile
+        app = FastAPI()
+
+        @app.post("/api/v1/chat/completions")
+        async def chat_completions(request: Request):
+            body = await request.json()
+            self.requests += 1
+            await asyncio.sleep(self.profile.delay())
+            if self.profile.should_fail():
+                self.failures += 1
+                return JSONResponse(status_code=self.profile.error_status, content={"error": {"message": "Injected failure"}})
+            return {
+                "id": f"gen-{self.requests}",
+                "model": body.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": self.reply}, "finish_reason": "stop"}],
+            }
+
+        super().__init__(app)
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.url}/api/v1"
+
+
+class FakeTelegram(_HttpFake):
+    """Accepts sendMessage for any bot token"""
+
+    def __init__(self, profile: FaultProfile):
+        self.profile = profile
+        app = FastAPI()
+
+        @app.post("/bot{token}/sendMessage")
+        async def send_message(token: str, request: Request):
+            body = await request.json()
+            self.requests += 1
+            await asyncio.sleep(self.profile.delay())
+            if self.profile.should_fail():
+                self.failures += 1
+                return JSONResponse(status_code=self.profile.error_status, content={"ok": False, "description": "Injected failure"})
+            return {"ok": True, "result": {"message_id": self.requests, "chat": {"id": body.get("chat_id")}, "text": body.get("text")}}
+
+        super().__init__(app)
+
+
+class _SmtpHandler:
+    def __init__(self, fake):
+        self.fake = fake
+
+    async def handle_DATA(self, server, session, envelope):
+        self.fake.requests += 1
+        await asyncio.sleep(self.fake.profile.delay())
+        if self.fake.profile.should_fail():
+            self.fake.failures += 1
+            return "451 4.3.0 Injected failure"
+        return "250 Message accepted"
+
+
+class FakeSMTP:
+    """aiosmtpd server that accepts any login and discards messages"""
+
+    def __init__(self, profile: FaultProfile):
+        self.profile = profile
+        self.port = free_port()
+        self.requests = 0
+        self.failures = 0
+        self._controller = Controller(
+            _SmtpHandler(self),
+            hostname="127.0.0.1",
+            port=self.port,
+            authenticator=lambda server, session, envelope, mechanism, auth_data: AuthResult(success=True),
+            auth_require_tls=False,
+        )
+
+    def start(self):
+        self._controller.start()
+
+    def stop(self):
+        self._controller.stop()
+
+
+class FakeServices:
+    """Start all fakes, and give the environment that points the app at them"""
+
+    def __init__(self, openrouter: FaultProfile = None, telegram: FaultProfile = None, smtp: FaultProfile = None):
+        self.openrouter = FakeOpenRouter(openrouter or FaultProfile())
+        self.telegram = FakeTelegram(telegram or FaultProfile())
+        self.smtp = FakeSMTP(smtp or FaultProfile())
+
+    def __enter__(self):
+        for fake in (self.openrouter, self.telegram, self.smtp):
+            fake.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        for fake in (self.openrouter, self.telegram, self.smtp):
+            fake.stop()
+
+    def env(self) -> dict:
+        return {
+            "OPENROUTER_BASE_URL": self.openrouter.base_url,
+            "OPENROUTER_API_KEY_1": "bench-key",
+            "TELEGRAM_API_BASE": self.telegram.url,
+            "TELEGRAM_BOT_TOKEN": "bench-token",
+            "TELEGRAM_CHAT_ID": "1",
+            "SMTP_HOST": "127.0.0.1",
+            "SMTP_PORT": str(self.smtp.port),
+            "SMTP_START_TLS": "false",
+            "SMTP_EMAIL": "shop@example.com",
+            "SMTP_PASSWORD": "bench",
+            "RECIPIENT_EMAIL": "admin@example.com",
+        }
+
+    def stats(self) -> dict:
+        return {
+            name: {"requests": fake.requests, "failures": fake.failures}
+            for name, fake in (("openrouter", self.openrouter), ("telegram", self.telegram), ("smtp", self.smtp))
+        }
@@ -0,0 +1,331 @@
+"""
+Load test: run a mixed workload against a local instance of the API.
+
+The app is started with uvicorn in a subprocess, against a fresh SQLite
+database (or --database-url, e.g. a scratch Postgres database), with
+OpenRouter, Telegram and SMTP replaced by the local fakes in
+benchmarks/fakes.py. Virtual users then loop over weighted scenarios for
+--duration seconds and the per-route throughput and latency percentiles
+are reported.
+
+    python -m benchmarks.loadtest --duration 30 --users 20 --output run.json
+    python -m benchmarks.loadtest --duration 30 --users 20 --compare run.json
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.fakes import FakeServices, FaultProfile, free_port
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_MIX = "browse=50,checkout=15,chat=25,dashboard=10"
+ADMIN_USERNAME = "bench-admin"
+ADMIN_PASSWORD = "bench-password"
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+
+    async def request(self, client: httpx.AsyncClient, route: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status_code = response.status_code
+        except httpx.HTTPError:
+            response, status_code = None, 0
+        elapsed = time.perf_counter() - start
+        self.samples.setdefault(route, []).append((elapsed, status_code))
+        return response
+
+    def summary(self, duration: float) -> dict:
+        routes = {}
+        for route, samples in sorted(self.samples.items()):
+            latencies = sorted(elapsed * 1000 for elapsed, _ in samples)
+            errors = sum(1 for _, status_code in samples if status_code == 0 or status_code >= 400)
+            routes[route] = {
+                "requests": len(samples),
+                "errors": errors,
+                "throughput_rps": round(len(samples) / duration, 2),
+                "mean_ms": round(sum(latencies) / len(latencies), 2),
+                "p50_ms": round(percentile(latencies, 50), 2),
+                "p95_ms": round(percentile(latencies, 95), 2),
+                "p99_ms": round(percentile(latencies, 99), 2),
+                "max_ms": round(latencies[-1], 2),
+            }
+        return routes
+
+
+# Scenarios: one virtual user's visit, built from the app's public and admin flows
+
+async def browse(client, recorder, rng, state):
+    response = await recorder.request(client, "GET /api/products/", "GET", "/api/products/")
+    if response is not None and response.status_code == 200 and response.json():
+        product = rng.choice(response.json())
+        await recorder.request(client, "GET /api/products/{product_id}", "GET", f"/api/products/{product['id']}")
+
+
+async def checkout(client, recorder, rng, state):
+    customer_number = rng.randrange(1_000_000)
+    await recorder.request(client, "POST /api/orders/", "POST", "/api/orders/", json={
+        "customer": {
+            "full_name": f"Bench Customer {customer_number}",
+            "email": f"customer{customer_number}@example.com",
+            "phone": "01700000000",
+            "address": "House 1, Road 2",
+            "city": "Dhaka",
+            "country": "Bangladesh",
+        },
+        "product_id": rng.choice(state["product_ids"]),
+        "quantity": rng.randint(1, 3),
+        "delivery_address": "House 1, Road 2, Dhaka",
+    })
+
+
+async def chat(client, recorder, rng, state):
+    await recorder.request(client, "POST /api/chat/", "POST", "/api/chat/", json={
+        "message": rng.choice(["What are the specifications?", "How much does the 86 inch model cost?", "How do I order?"]),
+        "session_id": f"bench-{rng.randrange(10_000)}",
+    })
+
+
+async def dashboard(client, recorder, rng, state):
+    headers = {"Authorization": f"Bearer {state['admin_token']}"}
+    await recorder.request(client, "GET /api/dashboard/stats", "GET", "/api/dashboard/stats", headers=headers)
+    await recorder.request(client, "GET /api/orders/", "GET", "/api/orders/", params={"limit": 50}, headers=headers)
+
+
+SCENARIOS = {"browse": browse, "checkout": checkout, "chat": chat, "dashboard": dashboard}
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}', expected one of {', '.join(SCENARIOS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+async def seed(client: httpx.AsyncClient, products: int) -> dict:
+    """Create the admin and products the workload needs, through the API"""
+    await client.post("/api/admin/register", json={
+        "username": ADMIN_USERNAME, "email": "bench-admin@example.com", "password": ADMIN_PASSWORD,
+    })
+    response = await client.post("/api/admin/login", json={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD})
+    response.raise_for_status()
+    token = response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await client.get("/api/products/")
+    product_ids = [product["id"] for product in response.json()]
+    for index in range(len(product_ids), products):
+        response = await client.post("/api/products/", headers=headers, json={
+            "name": f"Interactive Smart Board {65 + index}\"",
+            "description": "Android 12, 16GB RAM, 256GB storage, 48MP AI camera",
+            "price": 150000 + index * 10000,
+            "specifications": {"os": "Android 12", "ram": "16GB", "storage": "256GB"},
+            "images": [],
+            "stock_quantity": 100,
+        })
+        response.raise_for_status()
+        product_ids.append(response.json()["id"])
+    return {"admin_token": token, "product_ids": product_ids}
+
+
+async def run_workload(base_url: str, args) -> dict:
+    weights = parse_mix(args.mix)
+    names, scenario_weights = list(weights), list(weights.values())
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        state = await seed(client, args.products)
+
+        async def virtual_user(index: int, deadline: float):
+            rng = random.Random(args.seed * 1000 + index)
+            while time.monotonic() < deadline:
+                scenario = SCENARIOS[rng.choices(names, scenario_weights)[0]]
+                await scenario(client, recorder, rng, state)
+                if args.think_time_ms:
+                    await asyncio.sleep(rng.expovariate(1000 / args.think_time_ms))
+
+        if args.warmup:
+            warmup_deadline = time.monotonic() + args.warmup
+            await asyncio.gather(*(virtual_user(index, warmup_deadline) for index in range(args.users)))
+            recorder.samples.clear()
+
+        start = time.monotonic()
+        await asyncio.gather(*(virtual_user(index, start + args.duration) for index in range(args.users)))
+        elapsed = time.monotonic() - start
+
+    routes = recorder.summary(elapsed)
+    total = sum(route["requests"] for route in routes.values())
+    return {
+        "duration_s": round(elapsed, 2),
+        "total_requests": total,
+        "throughput_rps": round(total / elapsed, 2),
+        "routes": routes,
+    }
+
+
+def start_app(env: dict, port: int, workers: int) -> subprocess.Popen:
+    command = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+    ]
+    return subprocess.Popen(command, cwd=REPO_ROOT, env=env)
+
+
+def wait_until_healthy(base_url: str, process: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"App exited with code {process.returncode} during startup")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit("App did not become healthy in time")
+
+
+def app_env(args, fakes: FakeServices, database_url: str) -> dict:
+    env = dict(os.environ)
+    env.update(fakes.env())
+    env.update({
+        "DATABASE_URL": database_url,
+        "JWT_SECRET_KEY": "bench-secret",
+        "MEDIA_RECONCILE_ON_STARTUP": "false",
+        "LOG_LEVEL": "WARNING",
+        # The workload comes from one IP; keep admission control out of the way
+        "CHAT_RATE_PER_MINUTE_IP": "1000000",
+        "CHAT_BURST_IP": "1000000",
+        "CHAT_RATE_PER_MINUTE_SESSION": "1000000",
+        "CHAT_BURST_SESSION": "1000000",
+    })
+    return env
+
+
+def print_report(result: dict):
+    print(f"\n{result['total_requests']} requests in {result['duration_s']}s ({result['throughput_rps']} req/s)\n")
+    header = f"{'route':40} {'reqs':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}"
+    print(header)
+    print("-" * len(header))
+    for route, stats in result["routes"].items():
+        print(
+            f"{route:40} {stats['requests']:>7} {stats['errors']:>5} {stats['throughput_rps']:>8} "
+            f"{stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8}"
+        )
+
+
+def compare(result: dict, baseline: dict, threshold: float) -> list:
+    """Print per-route changes against a baseline; return routes whose p95 or throughput regressed"""
+    regressions = []
+    print(f"\nCompared with baseline (regression threshold {threshold:.0%}):\n")
+    header = f"{'route':40} {'p95 before':>11} {'p95 after':>10} {'change':>8} {'rps change':>11}"
+    print(header)
+    print("-" * len(header))
+    for route, stats in result["routes"].items():
+        before = baseline["routes"].get(route)
+        if not before:
+            print(f"{route:40} {'-':>11} {stats['p95_ms']:>10} {'new':>8}")
+            continue
+        p95_change = (stats["p95_ms"] - before["p95_ms"]) / before["p95_ms"] if before["p95_ms"] else 0
+        rps_change = (stats["throughput_rps"] - before["throughput_rps"]) / before["throughput_rps"] if before["throughput_rps"] else 0
+        flag = ""
+        if p95_change > threshold or rps_change < -threshold:
+            regressions.append(route)
+            flag = "  REGRESSION"
+        print(f"{route:40} {before['p95_ms']:>11} {stats['p95_ms']:>10} {p95_change:>+8.1%} {rps_change:>+11.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a mixed workload against a local instance of the API")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds of load")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds of load before measuring")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--think-time-ms", type=float, default=0, help="Mean pause between a user's scenarios")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Scenario weights, e.g. browse=50,checkout=15,chat=25,dashboard=10")
+    parser.add_argument("--products", type=int, default=10, help="Products to seed")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for scenario choice and fault injection")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--database-url", help="Database to use (default: a fresh SQLite file). Use a scratch database.")
+    parser.add_argument("--base-url", help="Benchmark an already running server instead of starting one")
+    parser.add_argument("--llm-latency-ms", type=float, default=800)
+    parser.add_argument("--llm-jitter-ms", type=float, default=200)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--telegram-latency-ms", type=float, default=100)
+    parser.add_argument("--telegram-error-rate", type=float, default=0.0)
+    parser.add_argument("--smtp-latency-ms", type=float, default=150)
+    parser.add_argument("--smtp-error-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative p95/throughput change that counts as a regression")
+    args = parser.parse_args(argv)
+
+    fakes = FakeServices(
+        openrouter=FaultProfile(args.llm_latency_ms, args.llm_jitter_ms, args.llm_error_rate, seed=args.seed),
+        telegram=FaultProfile(args.telegram_latency_ms, 0, args.telegram_error_rate, seed=args.seed + 1),
+        smtp=FaultProfile(args.smtp_latency_ms, 0, args.smtp_error_rate, seed=args.seed + 2),
+    )
+
+    with fakes, tempfile.TemporaryDirectory() as tmpdir:
+        process = None
+        base_url = args.base_url
+        if base_url is None:
+            database_url = args.database_url or f"sqlite:///{Path(tmpdir) / 'bench.db'}"
+            port = free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            process = start_app(app_env(args, fakes, database_url), port, args.workers)
+        try:
+            if process:
+                wait_until_healthy(base_url, process)
+            result = asyncio.run(run_workload(base_url, args))
+        finally:
+            if process:
+                process.terminate()
+                process.wait(timeout=10)
+
+    result["config"] = {key: value for key, value in vars(args).items() if key not in ("output", "compare")}
+    result["upstream"] = fakes.stats()
+    result["platform"] = {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()}
+
+    print_report(result)
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if compare(result, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
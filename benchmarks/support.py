@@ -0,0 +1,136 @@
+"""
+Shared setup for the micro-benchmarks (benchmarks/bench_*.py).
+
+Importing this module points the app at a throwaway SQLite database
+(or BENCH_DATABASE_URL), so it must be imported before any app module.
+"""
+
+from datetime import datetime, timedelta, timezone
+import os
+import random
+import tempfile
+
+# Never let a benchmark seed the database configured in .env
+os.environ["DATABASE_URL"] = os.getenv(
+    "BENCH_DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='bench-')}/bench.db"
+)
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "bench-token")
+os.environ.setdefault("MEDIA_RECONCILE_ON_STARTUP", "false")
+
+from models import Base, Customer, Order, Product  # noqa: E402
+from database import engine, SessionLocal  # noqa: E402
+
+STATUSES = ["pending", "confirmed", "shipped", "delivered", "cancelled"]
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def make_product(product_id: int) -> Product:
+    return Product(
+        id=product_id,
+        name=f"Interactive Smart Board {65 + product_id}\"",
+        description="Android 12, 16GB RAM, 256GB storage, 48MP AI camera, 8 microphones",
+        price=150000.0 + product_id * 10000,
+        specifications={"os": "Android 12", "ram": "16GB", "storage": "256GB", "camera": "48MP"},
+        images=[f"/static/images/board-{product_id}.jpg", f"/static/images/board-{product_id}-side.jpg"],
+        video_url=f"/static/videos/board-{product_id}.mp4",
+        stock_quantity=100,
+        is_active=True,
+        created_at=NOW,
+    )
+
+
+def make_orders(count: int, seed: int = 1) -> list:
+    """Transient orders with their customer and product attached, as the API serializes them"""
+    rng = random.Random(seed)
+    products = [make_product(product_id) for product_id in range(1, 11)]
+    orders = []
+    for order_id in range(1, count + 1):
+        product = rng.choice(products)
+        quantity = rng.randint(1, 3)
+        customer = Customer(
+            id=order_id,
+            full_name=f"Customer {order_id}",
+            email=f"customer{order_id}@example.com",
+            phone="01700000000",
+            address="House 1, Road 2",
+            city="Dhaka",
+            country="Bangladesh",
+            created_at=NOW,
+        )
+        orders.append(Order(
+            id=order_id,
+            customer_id=customer.id,
+            product_id=product.id,
+            quantity=quantity,
+            total_price=product.price * quantity,
+            status=rng.choice(STATUSES),
+            special_requirements="Wall mount" if order_id % 3 == 0 else None,
+            delivery_address="House 1, Road 2, Dhaka",
+            order_date=NOW - timedelta(minutes=order_id),
+            customer=customer,
+            product=product,
+        ))
+    return orders
+
+
+def sample_order_data(order_id: int = 42) -> tuple:
+    """(order_data, customer_data) dicts as passed to the notification services"""
+    order_data = {
+        "id": order_id,
+        "product_name": "Interactive Smart Board 86\"",
+        "quantity": 2,
+        "total_price": 420000.0,
+        "status": "confirmed",
+        "special_requirements": "Wall mount and installation",
+        "delivery_address": "House 1, Road 2, Dhaka",
+        "order_date": NOW.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    customer_data = {
+        "full_name": "Customer 42",
+        "email": "customer42@example.com",
+        "phone": "01700000000",
+        "address": "House 1, Road 2",
+        "city": "Dhaka",
+        "country": "Bangladesh",
+    }
+    return order_data, customer_data
+
+
+def seed_database(orders: int = 5000, customers: int = 1000, seed: int = 1):
+    """Recreate the tables and fill them with a deterministic dataset"""
+    rng = random.Random(seed)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    product_rows = [
+        {column.name: getattr(make_product(product_id), column.name) for column in Product.__table__.columns}
+        for product_id in range(1, 11)
+    ]
+    with engine.begin() as conn:
+        conn.execute(Product.__table__.insert(), product_rows)
+        conn.execute(Customer.__table__.insert(), [
+            {
+                "id": customer_id,
+                "full_name": f"Customer {customer_id}",
+                "email": f"customer{customer_id}@example.com",
+                "phone": "01700000000",
+                "city": "Dhaka",
+                "country": "Bangladesh",
+                "created_at": NOW,
+            }
+            for customer_id in range(1, customers + 1)
+        ])
+        conn.execute(Order.__table__.insert(), [
+            {
+                "id": order_id,
+                "customer_id": rng.randint(1, customers),
+                "product_id": rng.randint(1, 10),
+                "quantity": 1,
+                "total_price": 150000.0,
+                "status": rng.choice(STATUSES),
+                "delivery_address": "House 1, Road 2, Dhaka",
+                "order_date": NOW - timedelta(minutes=order_id),
+            }
+            for order_id in range(1, orders + 1)
+        ])
+    return SessionLocal
@@ -1,9 +1,15 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from contextvars import ContextVar
+from typing import Optional
 import os
+import time
+import logging
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 load_dotenv()
 
 # Get the database URL from environment variables
@@ -24,6 +30,54 @@ else:
     # Local development
     engine = create_engine(DATABASE_URL)
 
+# Statements slower than this are logged, with their parameters redacted
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+
+class QueryStats:
+    """Statements executed on behalf of one request, and the time they took"""
+    __slots__ = ("count", "duration")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+# Set per request by QueryStatsMiddleware; context is copied into worker threads
+query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def _redact_parameters(parameters):
+    """Parameter shape without values, which may hold personal data or secrets"""
+    if isinstance(parameters, dict):
+        return {key: "?" for key in parameters}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (list, tuple, dict)):
+            return f"<{len(parameters)} parameter sets>"
+        return ["?"] * len(parameters)
+    return "?"
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += elapsed
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        logger.warning(
+            f"Slow query ({elapsed * 1000:.1f} ms): {' '.join(statement.split())} "
+            f"parameters={_redact_parameters(parameters)}"
+        )
+
+@event.listens_for(engine, "handle_error")
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute
+    start_times = exception_context.connection.info.get("query_start_time") if exception_context.connection else None
+    if start_times:
+        start_times.pop()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
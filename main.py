@@ -1,13 +1,25 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from logging_config import configure_logging, NonBlockingQueueHandler
+
+# Before anything else logs, so every record goes through the queue
+configure_logging()
+
+from fastapi import FastAPI, HTTPException, Request, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+import asyncio
+import logging
 import os
 import shutil
 import uuid
 from pathlib import Path
 
 from database import engine
+from static_files import CachedStaticFiles
+from middleware import CompressionMiddleware, MetricsMiddleware, QueryStatsMiddleware, RequestIdMiddleware
+import metrics
+from rate_limit import chat_admission
+from services.asset_manifest import static_manifest
+from services import media_library, media_gc, search_index
 from models import Base
 from routes import (
     product_router,
@@ -15,11 +27,20 @@ from routes import (
     chat_router,
     admin_router,
     dashboard_router,
-    files_router
+    files_router,
+    media_router,
+    search_router
 )
 
-# Create tables
+logger = logging.getLogger(__name__)
+
+# Create tables, and the full-text indexes that stay current on their own after this
 Base.metadata.create_all(bind=engine)
+# create_all skips existing tables; add indexes declared since they were created
+for table in Base.metadata.sorted_tables:
+    for index in table.indexes:
+        index.create(bind=engine, checkfirst=True)
+search_index.ensure_search_indexes(engine)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -27,7 +48,8 @@ app = FastAPI(
     description="API for SmartTech Interactive Smart Board E-commerce Platform",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware - more restrictive for production
@@ -52,8 +74,59 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress API responses (static files carry their own precompressed variants)
+app.add_middleware(CompressionMiddleware)
+
+# Per-request SQL statement count and time, reported in Server-Timing
+app.add_middleware(QueryStatsMiddleware)
+
+# Correlation ID for logs emitted while handling a request
+app.add_middleware(RequestIdMiddleware)
+
+# Outermost, so recorded latency includes CORS and compression
+app.add_middleware(MetricsMiddleware)
+
+# Fingerprint and precompress static assets new since the last build, without
+# delaying startup; until it finishes the manifest saved last time is served
+async def _build_static_manifest():
+    try:
+        await asyncio.to_thread(static_manifest.build)
+    except Exception:
+        logger.exception("Static manifest build failed")
+
+@app.on_event("startup")
+async def build_static_manifest():
+    app.state.static_manifest_build = asyncio.create_task(_build_static_manifest())
+
+# Index media files added outside the API, without delaying startup
+async def _reconcile_media_library():
+    try:
+        await asyncio.to_thread(media_library.reconcile)
+    except Exception:
+        logger.exception("Media library reconcile failed")
+
+@app.on_event("startup")
+async def reconcile_media_library():
+    if os.getenv("MEDIA_RECONCILE_ON_STARTUP", "true").lower() == "true":
+        app.state.media_reconcile = asyncio.create_task(_reconcile_media_library())
+
+# Periodically collect media no product references any more
+async def _collect_media_garbage(interval_hours: float):
+    while True:
+        await asyncio.sleep(interval_hours * 3600)
+        try:
+            await asyncio.to_thread(media_gc.collect_garbage)
+        except Exception:
+            logger.exception("Media garbage collection failed")
+
+@app.on_event("startup")
+async def schedule_media_gc():
+    interval_hours = float(os.getenv("MEDIA_GC_INTERVAL_HOURS", 0))
+    if interval_hours > 0:
+        app.state.media_gc = asyncio.create_task(_collect_media_garbage(interval_hours))
+
 # Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", CachedStaticFiles(directory="static"), name="static")
 
 # Include routers
 app.include_router(product_router)
@@ -62,6 +135,8 @@ app.include_router(chat_router)
 app.include_router(admin_router)
 app.include_router(dashboard_router)
 app.include_router(files_router)
+app.include_router(media_router)
+app.include_router(search_router)
 
 # Root endpoint
 @app.get("/")
@@ -89,6 +164,28 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "SmartTech E-commerce API"}
 
+# Prometheus metrics endpoint, optionally guarded by a bearer token
+metrics.registry.gauge(
+    "chat_llm_calls_in_flight", "Upstream chatbot calls in progress",
+    function=lambda: chat_admission.llm_calls.in_flight
+)
+metrics.registry.gauge(
+    "chat_llm_calls_waiting", "Chat requests queued for an upstream call slot",
+    function=lambda: chat_admission.llm_calls.waiting
+)
+metrics.registry.gauge(
+    "log_records_dropped", "Log records dropped because the log queue was full",
+    function=lambda: NonBlockingQueueHandler.dropped
+)
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    """Metrics in Prometheus text format"""
+    metrics_token = os.getenv("METRICS_TOKEN")
+    if metrics_token and request.headers.get("authorization") != f"Bearer {metrics_token}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
 # Error handlers
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
@@ -0,0 +1,304 @@
+from starlette.datastructures import Headers, MutableHeaders
+import os
+import re
+import time
+import uuid
+import zlib
+from dotenv import load_dotenv
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional
+    zstandard = None
+
+from static_files import parse_accept_encoding
+from database import QueryStats, query_stats
+from logging_config import request_id
+from metrics import http_requests_total, http_requests_in_progress, http_request_duration_seconds, db_queries_per_request, db_time_per_request_seconds
+
+load_dotenv()
+
+# Content types that are already compressed or not worth compressing
+INCOMPRESSIBLE_TYPES = ("image/", "video/", "audio/", "font/woff")
+INCOMPRESSIBLE_SUBTYPES = {
+    "application/zip", "application/gzip", "application/x-gzip", "application/zstd",
+    "application/octet-stream", "application/pdf",
+}
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdEncoder:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """Compress responses with zstd, brotli or gzip, negotiated from Accept-Encoding.
+
+    Bodies smaller than `minimum_size` are left alone, as are responses that
+    already carry a Content-Encoding, partial responses and media types
+    that are compressed already. Streaming responses are compressed chunk
+    by chunk. Paths under `exclude_paths` (static files and media, which
+    have their own precompressed variants) are passed straight through.
+    """
+
+    def __init__(self, app, minimum_size: int = None, exclude_paths=("/static", "/media")):
+        self.app = app
+        self.minimum_size = minimum_size if minimum_size is not None else int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1024))
+        self.exclude_paths = tuple(exclude_paths)
+        # Preferred first when the client accepts several equally
+        self.encoders = {}
+        if zstandard is not None:
+            self.encoders["zstd"] = (_ZstdEncoder, int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3)))
+        if brotli is not None:
+            self.encoders["br"] = (_BrotliEncoder, int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4)))
+        self.encoders["gzip"] = (_GzipEncoder, int(os.getenv("COMPRESSION_GZIP_LEVEL", 6)))
+
+    def _select_encoding(self, accept_encoding: str):
+        accepted = parse_accept_encoding(accept_encoding)
+        best, best_q = None, 0.0
+        for encoding in self.encoders:
+            q = accepted.get(encoding, accepted.get("*", 0.0))
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._select_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, encoding, self.encoders[encoding], self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send, encoding: str, encoder, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.encoder_class, self.level = encoder
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.encoder = None
+        self.passthrough = False
+
+    def _compressible(self, headers: Headers) -> bool:
+        if self.start_message["status"] in (204, 206, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return not content_type.startswith(INCOMPRESSIBLE_TYPES) and content_type not in INCOMPRESSIBLE_SUBTYPES
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            # Hold the headers until we know whether the body gets compressed
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is None:
+            headers = MutableHeaders(raw=list(self.start_message["headers"]))
+            self.start_message["headers"] = headers.raw
+            if not self._compressible(headers) or (not more_body and len(body) < self.minimum_size):
+                self.passthrough = True
+                if self._compressible(headers):
+                    headers.add_vary_header("Accept-Encoding")
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            self.encoder = self.encoder_class(self.level)
+            headers["content-encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                # Streaming: the compressed length is not known up front
+                del headers["content-length"]
+            else:
+                compressed = self.encoder.compress(body) + self.encoder.finish()
+                headers["content-length"] = str(len(compressed))
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": compressed, "more_body": False})
+                return
+            await self._send(self.start_message)
+
+        compressed = self.encoder.compress(body)
+        if not more_body:
+            compressed += self.encoder.finish()
+        if compressed or not more_body:
+            await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+
+class MetricsMiddleware:
+    """Record request counts, in-flight requests and latency per route.
+
+    Requests are labelled by the route template (`/api/orders/{order_id}`)
+    or mount path (`/static/{path}`) that handled them, never the raw path,
+    so label cardinality stays bounded. Unrouted requests share the
+    `unmatched` label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        root_path = scope.get("root_path", "")
+        status_code = 500
+        in_progress = http_requests_in_progress.labels(method)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            in_progress.dec()
+            labels = (method, route_template(scope, root_path), str(status_code))
+            http_requests_total.labels(*labels).inc()
+            http_request_duration_seconds.labels(*labels).observe(duration)
+
+
+def route_template(scope, root_path: str = "") -> str:
+    """Route template or mount path that handled a request, for use as a metric label"""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Plain Starlette routes (/docs, /openapi.json) only leave their endpoint
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        for candidate in getattr(scope.get("app"), "routes", ()):
+            if getattr(candidate, "endpoint", None) is endpoint:
+                return candidate.path
+    mount_path = scope.get("root_path", "")
+    if mount_path != root_path:
+        return f"{mount_path[len(root_path):]}/{{path}}"
+    return "unmatched"
+
+
+class QueryStatsMiddleware:
+    """Attribute SQL statements to the request that ran them.
+
+    The statement count and database time are reported in a
+    `Server-Timing` header (`db;dur=12.3;desc="4 queries"`, plus total
+    `app` time) and recorded per route, so N+1 query patterns stand out.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        root_path = scope.get("root_path", "")
+        stats = QueryStats()
+        token = query_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "server-timing",
+                    f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", app;dur={elapsed_ms:.1f}'
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            query_stats.reset(token)
+            route = route_template(scope, root_path)
+            db_queries_per_request.labels(route).observe(stats.count)
+            db_time_per_request_seconds.labels(route).observe(stats.duration)
+
+
+class RequestIdMiddleware:
+    """Give every request a correlation ID, exposed to logs and the client.
+
+    A well-formed incoming `X-Request-ID` (e.g. from a proxy) is reused,
+    otherwise one is generated. The ID is echoed in the response header
+    and attached to every log record emitted while handling the request.
+    """
+
+    header_pattern = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = Headers(scope=scope).get("x-request-id", "")
+        current_id = incoming if self.header_pattern.match(incoming) else uuid.uuid4().hex
+        token = request_id.set(current_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["x-request-id"] = current_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id.reset(token)
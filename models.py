@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, Boolean, Float, ForeignKey, JSON, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -23,6 +23,7 @@ class Product(Base):
     
     # Relationships
     orders = relationship("Order", back_populates="product")
+    media_links = relationship("ProductMedia", back_populates="product", cascade="all, delete-orphan")
 
 class Customer(Base):
     __tablename__ = "customers"
@@ -42,6 +43,15 @@ class Customer(Base):
 
 class Order(Base):
     __tablename__ = "orders"
+    # Listings sort by (order_date, id) descending; each filterable column leads an
+    # index that continues in that order, so a filtered page needs no sort step
+    __table_args__ = (
+        Index("ix_orders_order_date_id", "order_date", "id"),
+        Index("ix_orders_status_order_date", "status", "order_date", "id"),
+        Index("ix_orders_customer_order_date", "customer_id", "order_date", "id"),
+        Index("ix_orders_product_order_date", "product_id", "order_date", "id"),
+        Index("ix_orders_total_price", "total_price"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     customer_id = Column(Integer, ForeignKey("customers.id"))
@@ -92,4 +102,37 @@ class Admin(Base):
     hashed_password = Column(String)
     is_active = Column(Boolean, default=True)
     is_superuser = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class MediaAsset(Base):
+    __tablename__ = "media_assets"
+    __table_args__ = (
+        UniqueConstraint("file_type", "filename", name="uq_media_assets_type_filename"),
+        Index("ix_media_assets_type_created", "file_type", "created_at"),
+        Index("ix_media_assets_type_size", "file_type", "size"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), unique=True, index=True, nullable=False)
+    file_type = Column(String, nullable=False)  # images, videos
+    filename = Column(String, nullable=False)  # <sha256><ext>, or the original name for files added out-of-band
+    original_filename = Column(String)
+    content_type = Column(String)
+    size = Column(BigInteger)
+    width = Column(Integer)
+    height = Column(Integer)
+    duration = Column(Float)  # Seconds, videos only
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    product_links = relationship("ProductMedia", back_populates="media", cascade="all, delete-orphan")
+
+class ProductMedia(Base):
+    __tablename__ = "product_media"
+    
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    media_id = Column(Integer, ForeignKey("media_assets.id", ondelete="CASCADE"), primary_key=True, index=True)
+    
+    # Relationships
+    product = relationship("Product", back_populates="media_links")
+    media = relationship("MediaAsset", back_populates="product_links")
@@ -0,0 +1,216 @@
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+import asyncio
+import math
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from fastapi import Request
+
+load_dotenv()
+
+# Reverse proxies in front of the app that append to X-Forwarded-For
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", 0))
+
+LOGIN_FAILURE_WINDOW_SECONDS = float(os.getenv("LOGIN_FAILURE_WINDOW_SECONDS", 300))
+LOGIN_MAX_FAILURES_PER_USERNAME = int(os.getenv("LOGIN_MAX_FAILURES_PER_USERNAME", 5))
+LOGIN_MAX_FAILURES_PER_IP = int(os.getenv("LOGIN_MAX_FAILURES_PER_IP", 20))
+
+CHAT_RATE_PER_MINUTE_SESSION = float(os.getenv("CHAT_RATE_PER_MINUTE_SESSION", 10))
+CHAT_BURST_SESSION = int(os.getenv("CHAT_BURST_SESSION", 5))
+CHAT_RATE_PER_MINUTE_IP = float(os.getenv("CHAT_RATE_PER_MINUTE_IP", 30))
+CHAT_BURST_IP = int(os.getenv("CHAT_BURST_IP", 10))
+CHAT_MAX_INFLIGHT = int(os.getenv("CHAT_MAX_INFLIGHT", 8))
+CHAT_MAX_QUEUE = int(os.getenv("CHAT_MAX_QUEUE", 32))
+CHAT_QUEUE_TIMEOUT_SECONDS = float(os.getenv("CHAT_QUEUE_TIMEOUT_SECONDS", 10))
+CHAT_BUSY_RETRY_AFTER = 5
+
+
+def client_ip(request: Request) -> str:
+    """The caller's address, for keying rate limits.
+
+    Behind TRUSTED_PROXY_HOPS proxies this is the entry that many places from
+    the right of X-Forwarded-For, the one our outermost proxy appended;
+    anything further left is supplied by the client and can be forged.
+    """
+    peer = request.client.host if request.client else "unknown"
+    if TRUSTED_PROXY_HOPS <= 0:
+        return peer
+    forwarded = [
+        host.strip()
+        for value in request.headers.getlist("x-forwarded-for")
+        for host in value.split(",")
+        if host.strip()
+    ]
+    if not forwarded:
+        return peer
+    return forwarded[-min(TRUSTED_PROXY_HOPS, len(forwarded))]
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a caller is over its limit; `retry_after` is in whole seconds"""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(f"Rate limit exceeded, retry after {self.retry_after}s")
+
+
+class SlidingWindowCounter:
+    """Count events per key over a sliding time window, in memory.
+
+    Keys whose events have all expired are pruned, so the table only holds
+    keys seen within the last window.
+    """
+
+    def __init__(self, limit: int, window_seconds: float):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self._events = {}
+        self._lock = threading.Lock()
+
+    def _prune(self, key, now: float):
+        events = self._events.get(key)
+        if events is None:
+            return None
+        while events and events[0] <= now - self.window_seconds:
+            events.popleft()
+        if not events:
+            del self._events[key]
+            return None
+        return events
+
+    def retry_after(self, key) -> float:
+        """Seconds until `key` is below its limit again; 0 when it already is"""
+        now = time.monotonic()
+        with self._lock:
+            events = self._prune(key, now)
+            if events is None or len(events) < self.limit:
+                return 0
+            return events[len(events) - self.limit] + self.window_seconds - now
+
+    def add(self, key):
+        now = time.monotonic()
+        with self._lock:
+            events = self._prune(key, now)
+            if events is None:
+                events = self._events[key] = deque()
+            events.append(now)
+            if len(events) > self.limit:
+                events.popleft()
+
+    def reset(self, key):
+        with self._lock:
+            self._events.pop(key, None)
+
+
+class LoginThrottle:
+    """Lock out a username or client IP after repeated failed logins"""
+
+    def __init__(self):
+        self.usernames = SlidingWindowCounter(LOGIN_MAX_FAILURES_PER_USERNAME, LOGIN_FAILURE_WINDOW_SECONDS)
+        self.ips = SlidingWindowCounter(LOGIN_MAX_FAILURES_PER_IP, LOGIN_FAILURE_WINDOW_SECONDS)
+
+    def retry_after(self, username: str, ip: str) -> int:
+        """Whole seconds the caller must wait before trying again; 0 if allowed"""
+        wait = max(self.usernames.retry_after(username.lower()), self.ips.retry_after(ip))
+        return math.ceil(wait)
+
+    def record_failure(self, username: str, ip: str):
+        self.usernames.add(username.lower())
+        self.ips.add(ip)
+
+    def record_success(self, username: str):
+        self.usernames.reset(username.lower())
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets refilled at `rate` tokens per second up to `burst`.
+
+    At most `max_keys` buckets are kept; past that the least recently used
+    one is dropped, so callers inventing keys can't grow the table.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key):
+        """Take a token for `key`, or raise RateLimitExceeded when the bucket is empty"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens < 1:
+                raise RateLimitExceeded((1 - tokens) / self.rate)
+            self._buckets[key] = (tokens - 1, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+
+class ConcurrencyLimiter:
+    """Cap concurrent work, with a bounded queue of waiters.
+
+    Callers beyond `max_concurrent` wait for a slot; once `max_queue`
+    callers are waiting, or a wait exceeds `queue_timeout`, further callers
+    are rejected straight away with RateLimitExceeded.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float, retry_after: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                raise RateLimitExceeded(self.retry_after)
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise RateLimitExceeded(self.retry_after)
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+
+class ChatAdmission:
+    """Admission control for the public chat endpoint.
+
+    Each message spends a token from its client IP's bucket and, when it
+    names one, its chat session's bucket. The upstream LLM call then needs
+    one of CHAT_MAX_INFLIGHT slots.
+    """
+
+    def __init__(self):
+        self.sessions = TokenBucketLimiter(CHAT_RATE_PER_MINUTE_SESSION / 60, CHAT_BURST_SESSION)
+        self.ips = TokenBucketLimiter(CHAT_RATE_PER_MINUTE_IP / 60, CHAT_BURST_IP)
+        self.llm_calls = ConcurrencyLimiter(CHAT_MAX_INFLIGHT, CHAT_MAX_QUEUE, CHAT_QUEUE_TIMEOUT_SECONDS, CHAT_BUSY_RETRY_AFTER)
+
+    def check(self, session_id: str, ip: str):
+        """Raise RateLimitExceeded when the client or session is sending too fast"""
+        self.ips.acquire(ip)
+        if session_id:
+            self.sessions.acquire(session_id)
+
+
+login_throttle = LoginThrottle()
+chat_admission = ChatAdmission()
@@ -1,27 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import asc, case, desc, func, literal, select, text, union_all, update
+from sqlalchemy.exc import SQLAlchemyError
+from typing import Any, Dict, List, Optional, Union
+from pydantic import TypeAdapter, ValidationError
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+import asyncio
+import logging
 import os
-import shutil
 import uuid
 from pathlib import Path
 
-from database import get_db
-from models import Product as ProductModel, Customer as CustomerModel, Order as OrderModel, ChatSession as ChatSessionModel, ChatMessage as ChatMessageModel, Admin as AdminModel
+from database import get_db, SessionLocal
+from models import Product as ProductModel, Customer as CustomerModel, Order as OrderModel, ChatSession as ChatSessionModel, ChatMessage as ChatMessageModel, Admin as AdminModel, MediaAsset as MediaAssetModel, ProductMedia as ProductMediaModel
 from schemas import *
-from auth import get_current_admin, authenticate_admin, create_access_token, get_password_hash
+from auth import AuthenticatedAdmin, get_current_admin, authenticate_admin_async, create_admin_access_token, get_password_hash_async
+from rate_limit import login_throttle, chat_admission, client_ip, RateLimitExceeded
 from services.email_service import EmailService
 from services.telegram_service import TelegramService
 from services.chatbot_service import ChatbotService
+from static_files import RangeFileResponse
+from services.media_service import MediaService, UploadTooLargeError, UploadNotFoundError, UploadIncompleteError, InvalidChunkError
+from services import bulk_io, media_library, media_gc, search_index
 import uuid
 
+logger = logging.getLogger(__name__)
+
 # Initialize services
 email_service = EmailService()
 telegram_service = TelegramService()
 chatbot_service = ChatbotService()
+media_service = MediaService()
 
 # Create routers
 product_router = APIRouter(prefix="/api/products", tags=["Products"])
@@ -30,6 +41,26 @@ chat_router = APIRouter(prefix="/api/chat", tags=["Chatbot"])
 admin_router = APIRouter(prefix="/api/admin", tags=["Admin"])
 dashboard_router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
 files_router = APIRouter(prefix="/api/admin/files", tags=["File Management"])
+media_router = APIRouter(prefix="/media", tags=["Media"])
+search_router = APIRouter(prefix="/api/search", tags=["Search"])
+
+# Serializers for hot list endpoints. Returning a Response directly skips
+# FastAPI's response_model pass, so each row is validated exactly once and
+# encoded by pydantic-core, with the same datetime/float output as before.
+product_list_adapter = TypeAdapter(List[Product])
+order_list_adapter = TypeAdapter(List[Order])
+chat_message_list_adapter = TypeAdapter(List[ChatMessage])
+chat_search_result_list_adapter = TypeAdapter(List[ChatSearchResult])
+order_summary_list_adapter = TypeAdapter(List[OrderSummary])
+order_compact_adapter = TypeAdapter(OrderListCompact)
+row_list_adapter = TypeAdapter(List[Dict[str, Any]])
+
+def _json_list_response(adapter: TypeAdapter, rows) -> Response:
+    """Validate ORM rows once and encode them straight to JSON bytes"""
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(rows, from_attributes=True)),
+        media_type="application/json"
+    )
 
 # Product Routes
 @product_router.get("/", response_model=List[Product])
@@ -40,7 +71,139 @@ async def get_products(
 ):
     """Get all active products"""
     products = db.query(ProductModel).filter(ProductModel.is_active == True).offset(skip).limit(limit).all()
-    return products
+    return _json_list_response(product_list_adapter, products)
+
+# Columns written by the product export, and accepted back by the import
+PRODUCT_EXPORT_COLUMNS = [
+    "id", "name", "description", "price", "specifications", "images", "video_url",
+    "stock_quantity", "is_active", "created_at", "updated_at",
+]
+PRODUCT_IMPORT_BATCH_SIZE = 500
+# Per-row errors listed in an import report; the rest are only counted
+PRODUCT_IMPORT_MAX_ERRORS = 1000
+EXPORT_YIELD_PER = 1000
+
+def _check_export_format(format: str):
+    if format not in bulk_io.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(bulk_io.FORMATS)}")
+
+def _stream_query(statement, columns: List[str], format: str):
+    """Encode a query's rows as they arrive from a server-side cursor, on a session of its own"""
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(stream_results=True, yield_per=EXPORT_YIELD_PER))
+        yield from bulk_io.encode_rows(result.mappings(), columns, format)
+    finally:
+        db.close()
+
+@product_router.get("/export")
+async def export_products(
+    format: str = "csv",
+    include_inactive: bool = True,
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
+):
+    """Stream the catalog as CSV or NDJSON (Admin only)"""
+    _check_export_format(format)
+    table = ProductModel.__table__
+    statement = select(*[table.c[column] for column in PRODUCT_EXPORT_COLUMNS]).order_by(table.c.id)
+    if not include_inactive:
+        statement = statement.where(table.c.is_active == True)
+    return StreamingResponse(
+        _stream_query(statement, PRODUCT_EXPORT_COLUMNS, format),
+        media_type=bulk_io.FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'}
+    )
+
+def _record_import_error(report: dict, row_number: int, errors: List[str]):
+    report["failed"] += 1
+    if len(report["errors"]) < PRODUCT_IMPORT_MAX_ERRORS:
+        report["errors"].append({"row": row_number, "errors": errors})
+
+def _import_product_batch(db: Session, batch: list, report: dict):
+    """Upsert one batch of validated rows: update by id where the product exists, insert otherwise"""
+    ids = {row.id for _, row in batch if row.id is not None}
+    existing = {product.id: product for product in db.query(ProductModel).filter(ProductModel.id.in_(ids))} if ids else {}
+    created = updated = 0
+    media_changed = []
+    try:
+        for _, row in batch:
+            data = row.dict(exclude_unset=True)
+            db_product = existing.get(row.id)
+            if db_product is None:
+                db_product = ProductModel(**data)
+                db.add(db_product)
+                if row.id is not None:
+                    existing[row.id] = db_product
+                created += 1
+            else:
+                for key, value in data.items():
+                    setattr(db_product, key, value)
+                updated += 1
+            if "images" in data or "video_url" in data:
+                media_changed.append(db_product)
+        db.flush()
+        media_library.sync_products_media(db, media_changed)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.warning(f"Product import batch failed: {e}")
+        message = str(getattr(e, "orig", None) or e).splitlines()[0]
+        for row_number, _ in batch:
+            _record_import_error(report, row_number, [f"Batch could not be saved: {message}"])
+        return
+    report["created"] += created
+    report["updated"] += updated
+
+@product_router.post("/import", response_model=ProductImportResult)
+async def import_products(
+    request: Request,
+    format: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
+):
+    """Create or update products from a CSV or NDJSON request body (Admin only)
+    
+    The body is parsed as it streams in and saved in batches. Rows with an
+    `id` of an existing product update it; other rows create products. The
+    format comes from `?format=` or the Content-Type (CSV by default).
+    Invalid rows are skipped and reported by row number.
+    """
+    if format is None:
+        format = "ndjson" if "json" in request.headers.get("content-type", "") else "csv"
+    _check_export_format(format)
+    
+    report = {"created": 0, "updated": 0, "failed": 0, "errors": []}
+    batch = []
+    explicit_ids = False
+    async for row_number, record, error in bulk_io.parse_rows(request.stream(), format, json_columns=("specifications", "images")):
+        if error:
+            _record_import_error(report, row_number, [error])
+            continue
+        # Exported timestamps are not imported
+        record.pop("created_at", None)
+        record.pop("updated_at", None)
+        try:
+            row = ProductImportRow(**record)
+        except ValidationError as e:
+            _record_import_error(report, row_number, [
+                f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+            ])
+            continue
+        explicit_ids = explicit_ids or row.id is not None
+        batch.append((row_number, row))
+        if len(batch) >= PRODUCT_IMPORT_BATCH_SIZE:
+            _import_product_batch(db, batch, report)
+            batch = []
+    if batch:
+        _import_product_batch(db, batch, report)
+    
+    if explicit_ids and db.bind.dialect.name == "postgresql":
+        # Inserts with explicit ids don't advance the sequence
+        db.execute(text("SELECT setval(pg_get_serial_sequence('products', 'id'), (SELECT COALESCE(MAX(id), 1) FROM products))"))
+        db.commit()
+    
+    logger.info(f"Product import: {report['created']} created, {report['updated']} updated, {report['failed']} failed")
+    return report
 
 @product_router.get("/{product_id}", response_model=Product)
 async def get_product(product_id: int, db: Session = Depends(get_db)):
@@ -54,11 +217,13 @@ async def get_product(product_id: int, db: Session = Depends(get_db)):
 async def create_product(
     product: ProductCreate,
     db: Session = Depends(get_db),
-    current_admin: AdminModel = Depends(get_current_admin)
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
 ):
     """Create a new product (Admin only)"""
     db_product = ProductModel(**product.dict())
     db.add(db_product)
+    db.flush()
+    media_library.sync_product_media(db, db_product)
     db.commit()
     db.refresh(db_product)
     return db_product
@@ -68,7 +233,7 @@ async def update_product(
     product_id: int,
     product: ProductUpdate,
     db: Session = Depends(get_db),
-    current_admin: AdminModel = Depends(get_current_admin)
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
 ):
     """Update a product (Admin only)"""
     db_product = db.query(ProductModel).filter(ProductModel.id == product_id).first()
@@ -79,11 +244,41 @@ async def update_product(
     for key, value in update_data.items():
         setattr(db_product, key, value)
     
+    if "images" in update_data or "video_url" in update_data:
+        media_library.sync_product_media(db, db_product)
+    
     db.commit()
     db.refresh(db_product)
     return db_product
 
 # Order Routes
+# Status changes that notify the admin and the customer
+NOTIFY_STATUSES = ['confirmed', 'shipped', 'delivered', 'cancelled']
+
+def _order_notification_data(db_order: OrderModel, db_product: ProductModel) -> dict:
+    """Order fields used by the email and Telegram notifications"""
+    return {
+        "id": db_order.id,
+        "product_name": db_product.name,
+        "quantity": db_order.quantity,
+        "total_price": db_order.total_price,
+        "status": db_order.status,
+        "special_requirements": db_order.special_requirements,
+        "delivery_address": db_order.delivery_address,
+        "order_date": db_order.order_date.strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+def _customer_notification_data(db_customer: CustomerModel) -> dict:
+    """Customer fields used by the email and Telegram notifications"""
+    return {
+        "full_name": db_customer.full_name,
+        "email": db_customer.email,
+        "phone": db_customer.phone,
+        "address": db_customer.address,
+        "city": db_customer.city,
+        "country": db_customer.country
+    }
+
 @order_router.post("/", response_model=Order)
 async def create_order(order: OrderCreate, db: Session = Depends(get_db)):
     """Create a new order"""
@@ -120,32 +315,15 @@ async def create_order(order: OrderCreate, db: Session = Depends(get_db)):
     db.refresh(db_order)
     
     # Prepare data for notifications
-    order_data = {
-        "id": db_order.id,
-        "product_name": product.name,
-        "quantity": db_order.quantity,
-        "total_price": db_order.total_price,
-        "status": db_order.status,
-        "special_requirements": db_order.special_requirements,
-        "delivery_address": db_order.delivery_address,
-        "order_date": db_order.order_date.strftime("%Y-%m-%d %H:%M:%S")
-    }
-    
-    customer_info = {
-        "full_name": db_customer.full_name,
-        "email": db_customer.email,
-        "phone": db_customer.phone,
-        "address": db_customer.address,
-        "city": db_customer.city,
-        "country": db_customer.country
-    }
+    order_data = _order_notification_data(db_order, product)
+    customer_info = _customer_notification_data(db_customer)
     
     # Send notifications
     try:
         await email_service.send_order_notification(order_data, customer_info)
         await telegram_service.send_order_notification(order_data, customer_info)
     except Exception as e:
-        print(f"Notification error: {e}")
+        logger.warning(f"Notification error: {e}")
         # Continue even if notifications fail
     
     # Return order with relationships
@@ -153,28 +331,237 @@ async def create_order(order: OrderCreate, db: Session = Depends(get_db)):
     db_order.product = product
     return db_order
 
-@order_router.get("/", response_model=List[Order])
+# Columns selectable with ?fields= on order listings
+ORDER_FIELD_COLUMNS = {
+    "id": OrderModel.id,
+    "customer_id": OrderModel.customer_id,
+    "customer_name": CustomerModel.full_name,
+    "customer_email": CustomerModel.email,
+    "customer_phone": CustomerModel.phone,
+    "product_id": OrderModel.product_id,
+    "product_name": ProductModel.name,
+    "quantity": OrderModel.quantity,
+    "total_price": OrderModel.total_price,
+    "status": OrderModel.status,
+    "special_requirements": OrderModel.special_requirements,
+    "delivery_address": OrderModel.delivery_address,
+    "order_date": OrderModel.order_date,
+    "updated_at": OrderModel.updated_at,
+}
+ORDER_SUMMARY_FIELDS = ["id", "customer_name", "total_price", "status", "order_date"]
+ORDER_VIEWS = ["full", "summary", "compact"]
+
+def _parse_order_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Validate a comma separated ?fields= list, always including the id"""
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in ORDER_FIELD_COLUMNS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown order field(s): {', '.join(unknown)}. Allowed: {', '.join(ORDER_FIELD_COLUMNS)}"
+        )
+    return ["id"] + [field for field in dict.fromkeys(requested) if field != "id"]
+
+def _order_projection_query(db: Session, field_names: List[str]):
+    """Select only the given order columns, joining customers/products only when needed"""
+    query = db.query(*[ORDER_FIELD_COLUMNS[name].label(name) for name in field_names]).select_from(OrderModel)
+    if any(name.startswith("customer_") and name != "customer_id" for name in field_names):
+        query = query.outerjoin(CustomerModel, CustomerModel.id == OrderModel.customer_id)
+    if "product_name" in field_names:
+        query = query.outerjoin(ProductModel, ProductModel.id == OrderModel.product_id)
+    return query
+
+def _order_list_response(db: Session, view: str, fields: Optional[str], filters: list, order_by: list, skip: int, limit: int) -> Response:
+    """Build an order listing in the requested view
+    
+    - full: every order with its customer and product embedded
+    - summary: OrderSummary rows, or just the columns named in `fields`
+    - compact: orders with customers, products once each in a side map
+    """
+    if view not in ORDER_VIEWS:
+        raise HTTPException(status_code=400, detail=f"view must be one of: {', '.join(ORDER_VIEWS)}")
+    
+    field_names = _parse_order_fields(fields)
+    if field_names or view == "summary":
+        query = _order_projection_query(db, field_names or ORDER_SUMMARY_FIELDS)
+        rows = query.filter(*filters).order_by(*order_by).offset(skip).limit(limit).all()
+        if field_names:
+            return Response(content=row_list_adapter.dump_json([dict(row._mapping) for row in rows]), media_type="application/json")
+        return _json_list_response(order_summary_list_adapter, rows)
+    
+    if view == "compact":
+        orders = db.query(OrderModel).options(selectinload(OrderModel.customer)).filter(
+            *filters
+        ).order_by(*order_by).offset(skip).limit(limit).all()
+        product_ids = {order.product_id for order in orders}
+        products = db.query(ProductModel).filter(ProductModel.id.in_(product_ids)).all() if product_ids else []
+        compact = order_compact_adapter.validate_python(
+            {"orders": orders, "products": {product.id: product for product in products}},
+            from_attributes=True
+        )
+        return Response(content=order_compact_adapter.dump_json(compact), media_type="application/json")
+    
+    orders = db.query(OrderModel).options(
+        selectinload(OrderModel.customer),
+        selectinload(OrderModel.product)
+    ).filter(*filters).order_by(*order_by).offset(skip).limit(limit).all()
+    return _json_list_response(order_list_adapter, orders)
+
+# Newest first; matches the (..., order_date, id) indexes on orders
+ORDER_LIST_ORDER_BY = [desc(OrderModel.order_date), desc(OrderModel.id)]
+
+def _order_filters(
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    customer_id: Optional[int] = None,
+    product_id: Optional[int] = None,
+    min_total: Optional[float] = None,
+    max_total: Optional[float] = None
+) -> list:
+    """Filter clauses for order listings; `date_from` is inclusive, `date_to` exclusive"""
+    if date_from and date_to and date_from >= date_to:
+        raise HTTPException(status_code=400, detail="from must be earlier than to")
+    if min_total is not None and max_total is not None and min_total > max_total:
+        raise HTTPException(status_code=400, detail="min_total must not exceed max_total")
+    
+    filters = []
+    if status:
+        filters.append(OrderModel.status == status)
+    if customer_id is not None:
+        filters.append(OrderModel.customer_id == customer_id)
+    if product_id is not None:
+        filters.append(OrderModel.product_id == product_id)
+    if date_from:
+        filters.append(OrderModel.order_date >= date_from)
+    if date_to:
+        filters.append(OrderModel.order_date < date_to)
+    if min_total is not None:
+        filters.append(OrderModel.total_price >= min_total)
+    if max_total is not None:
+        filters.append(OrderModel.total_price <= max_total)
+    return filters
+
+@order_router.get("/", response_model=Union[List[Order], List[OrderSummary], OrderListCompact, List[Dict[str, Any]]])
 async def get_orders(
     skip: int = 0,
     limit: int = 100,
     status: str = None,
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    customer_id: Optional[int] = None,
+    product_id: Optional[int] = None,
+    min_total: Optional[float] = None,
+    max_total: Optional[float] = None,
+    view: str = "full",
+    fields: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_admin: AdminModel = Depends(get_current_admin)
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
 ):
-    """Get all orders (Admin only)"""
-    query = db.query(OrderModel)
+    """Get all orders, newest first (Admin only)
     
-    if status:
-        query = query.filter(OrderModel.status == status)
+    Filters combine: `status`, `customer_id`, `product_id`, an order date
+    range (`from` inclusive, `to` exclusive) and `min_total`/`max_total`.
+    `view=summary` returns slim OrderSummary rows, `view=compact` returns
+    products once in a side map instead of inside every order, and
+    `fields=id,status,...` returns only the named columns.
+    """
+    filters = _order_filters(status, date_from, date_to, customer_id, product_id, min_total, max_total)
+    return _order_list_response(db, view, fields, filters, ORDER_LIST_ORDER_BY, skip, limit)
+
+@order_router.get("/export")
+async def export_orders(
+    format: str = "csv",
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    status: Optional[str] = None,
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
+):
+    """Stream orders with their customer and product names as CSV or NDJSON (Admin only)
+    
+    `from` is inclusive and `to` exclusive, both matched against the order
+    date. Rows are read through a server-side cursor, so memory use does not
+    depend on how many orders the range covers.
+    """
+    _check_export_format(format)
+    filters = _order_filters(status, date_from, date_to)
+    
+    columns = list(ORDER_FIELD_COLUMNS)
+    statement = select(*[ORDER_FIELD_COLUMNS[name].label(name) for name in columns]).select_from(OrderModel).outerjoin(
+        CustomerModel, CustomerModel.id == OrderModel.customer_id
+    ).outerjoin(
+        ProductModel, ProductModel.id == OrderModel.product_id
+    )
+    statement = statement.where(*filters).order_by(OrderModel.order_date, OrderModel.id)
+    
+    return StreamingResponse(
+        _stream_query(statement, columns, format),
+        media_type=bulk_io.FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="orders.{format}"'}
+    )
+
+async def _send_bulk_status_notifications(updates: list):
+    """Send the notifications for a bulk status change as one batch per channel"""
+    try:
+        await email_service.send_order_status_updates(updates)
+    except Exception as e:
+        logger.warning(f"Bulk email notification error: {e}")
+    try:
+        await telegram_service.send_bulk_status_update(updates)
+    except Exception as e:
+        logger.warning(f"Bulk Telegram notification error: {e}")
+
+@order_router.patch("/bulk", response_model=OrderBulkUpdateResult)
+async def bulk_update_orders(
+    bulk: OrderBulkUpdate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
+):
+    """Set the status of many orders in one transaction (Admin only)
+    
+    Orders already in that status are left alone. Notifications for the
+    changed orders are sent as one batch after the response.
+    """
+    order_ids = list(dict.fromkeys(bulk.order_ids))
+    updated_ids = set(db.execute(
+        update(OrderModel)
+        .where(OrderModel.id.in_(order_ids), OrderModel.status != bulk.status)
+        .values(status=bulk.status)
+        .returning(OrderModel.id),
+        execution_options={"synchronize_session": False}
+    ).scalars())
+    db.commit()
+    
+    orders = db.query(OrderModel).options(
+        joinedload(OrderModel.customer),
+        joinedload(OrderModel.product)
+    ).filter(OrderModel.id.in_(order_ids)).all()
+    found_ids = {order.id for order in orders}
+    
+    if bulk.status in NOTIFY_STATUSES:
+        updates = [
+            (_order_notification_data(order, order.product), _customer_notification_data(order.customer))
+            for order in sorted(orders, key=lambda order: order.id)
+            if order.id in updated_ids and order.customer and order.product
+        ]
+        if updates:
+            background_tasks.add_task(_send_bulk_status_notifications, updates)
     
-    orders = query.offset(skip).limit(limit).all()
-    return orders
+    return OrderBulkUpdateResult(
+        status=bulk.status,
+        updated=[order_id for order_id in order_ids if order_id in updated_ids],
+        unchanged=[order_id for order_id in order_ids if order_id in found_ids and order_id not in updated_ids],
+        not_found=[order_id for order_id in order_ids if order_id not in found_ids]
+    )
 
 @order_router.get("/{order_id}", response_model=Order)
 async def get_order(
     order_id: int,
     db: Session = Depends(get_db),
-    current_admin: AdminModel = Depends(get_current_admin)
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
 ):
     """Get a specific order (Admin only)"""
     order = db.query(OrderModel).filter(OrderModel.id == order_id).first()
@@ -187,7 +574,7 @@ async def update_order(
     order_id: int,
     order: OrderUpdate,
     db: Session = Depends(get_db),
-    current_admin: AdminModel = Depends(get_current_admin)
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
 ):
     """Update an order (Admin only)"""
     db_order = db.query(OrderModel).filter(OrderModel.id == order_id).first()
@@ -207,39 +594,22 @@ async def update_order(
     # Send notifications when status changes to specific values
     if 'status' in update_data and update_data['status'] != old_status:
         new_status = update_data['status']
-        if new_status in ['confirmed', 'shipped', 'delivered', 'cancelled']:
+        if new_status in NOTIFY_STATUSES:
             # Get customer and product information for notifications
             db_customer = db.query(CustomerModel).filter(CustomerModel.id == db_order.customer_id).first()
             db_product = db.query(ProductModel).filter(ProductModel.id == db_order.product_id).first()
             
             if db_customer and db_product:
                 # Prepare data for notifications
-                order_data = {
-                    "id": db_order.id,
-                    "product_name": db_product.name,
-                    "quantity": db_order.quantity,
-                    "total_price": db_order.total_price,
-                    "status": db_order.status,
-                    "special_requirements": db_order.special_requirements,
-                    "delivery_address": db_order.delivery_address,
-                    "order_date": db_order.order_date.strftime("%Y-%m-%d %H:%M:%S")
-                }
-                
-                customer_info = {
-                    "full_name": db_customer.full_name,
-                    "email": db_customer.email,
-                    "phone": db_customer.phone,
-                    "address": db_customer.address,
-                    "city": db_customer.city,
-                    "country": db_customer.country
-                }
+                order_data = _order_notification_data(db_order, db_product)
+                customer_info = _customer_notification_data(db_customer)
                 
                 # Send notifications
                 try:
                     await email_service.send_order_status_update(order_data, customer_info)
                     await telegram_service.send_order_status_update(order_data, customer_info)
                 except Exception as e:
-                    print(f"Notification error: {e}")
+                    logger.warning(f"Notification error: {e}")
                     # Continue even if notifications fail
     
     return db_order
@@ -248,7 +618,7 @@ async def update_order(
 async def delete_order(
     order_id: int,
     db: Session = Depends(get_db),
-    current_admin: AdminModel = Depends(get_current_admin)
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
 ):
     """Delete an order (Admin only)"""
     db_order = db.query(OrderModel).filter(OrderModel.id == order_id).first()
@@ -261,29 +631,42 @@ async def delete_order(
 
 # Chat Routes
 @chat_router.post("/", response_model=ChatMessageResponse)
-async def chat_with_bot(message_data: ChatMessageCreate, db: Session = Depends(get_db)):
+async def chat_with_bot(message_data: ChatMessageCreate, request: Request, db: Session = Depends(get_db)):
     """Chat with the AI assistant"""
-    session_id = message_data.session_id or str(uuid.uuid4())
+    try:
+        chat_admission.check(message_data.session_id, client_ip(request))
+    except RateLimitExceeded as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many messages, please slow down",
+            headers={"Retry-After": str(e.retry_after)},
+        )
     
-    # Get or create chat session
-    chat_session = db.query(ChatSessionModel).filter(ChatSessionModel.session_id == session_id).first()
-    if not chat_session:
-        chat_session = ChatSessionModel(session_id=session_id)
-        db.add(chat_session)
-        db.commit()
-        db.refresh(chat_session)
+    session_id = message_data.session_id or str(uuid.uuid4())
     
-    # Get AI response
+    # Get AI response; nothing is stored for requests turned away here
     try:
-        ai_response = await chatbot_service.get_response(
-            message_data.message, 
-            message_data.language
+        async with chat_admission.llm_calls.slot():
+            ai_response = await chatbot_service.get_response(
+                message_data.message, 
+                message_data.language
+            )
+    except RateLimitExceeded as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="The assistant is busy, please try again shortly",
+            headers={"Retry-After": str(e.retry_after)},
         )
-        print(f"AI Response: {ai_response}")
     except Exception as e:
-        print(f"Error getting AI response: {e}")
+        logger.exception(f"Error getting AI response: {e}")
         ai_response = "I'm having technical difficulties. Please contact us at 01678-134547."
     
+    # Get or create chat session, saved together with the message
+    chat_session = db.query(ChatSessionModel).filter(ChatSessionModel.session_id == session_id).first()
+    if not chat_session:
+        db.add(ChatSessionModel(session_id=session_id))
+        db.flush()
+    
     # Save chat message
     chat_message = ChatMessageModel(
         session_id=session_id,
@@ -307,21 +690,32 @@ async def get_chat_history(
         ChatMessageModel.session_id == session_id
     ).order_by(ChatMessageModel.timestamp).all()
     
-    return messages
+    return _json_list_response(chat_message_list_adapter, messages)
 
 # Admin Routes
 @admin_router.post("/login", response_model=Token)
-async def login_admin(admin_login: AdminLogin, db: Session = Depends(get_db)):
+async def login_admin(admin_login: AdminLogin, request: Request, db: Session = Depends(get_db)):
     """Admin login"""
-    admin = authenticate_admin(db, admin_login.username, admin_login.password)
+    ip = client_ip(request)
+    retry_after = login_throttle.retry_after(admin_login.username, ip)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts, please try again later",
+            headers={"Retry-After": str(retry_after)},
+        )
+    
+    admin = await authenticate_admin_async(db, admin_login.username, admin_login.password)
     if not admin:
+        login_throttle.record_failure(admin_login.username, ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = create_access_token(data={"sub": admin.username})
+    login_throttle.record_success(admin_login.username)
+    access_token = create_admin_access_token(admin)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @admin_router.post("/register", response_model=Admin)
@@ -337,7 +731,7 @@ async def register_admin(admin: AdminCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create new admin
-    hashed_password = get_password_hash(admin.password)
+    hashed_password = await get_password_hash_async(admin.password)
     db_admin = AdminModel(
         username=admin.username,
         email=admin.email,
@@ -351,17 +745,21 @@ async def register_admin(admin: AdminCreate, db: Session = Depends(get_db)):
     return db_admin
 
 @admin_router.get("/me", response_model=Admin)
-async def get_current_admin_info(current_admin: AdminModel = Depends(get_current_admin)):
+async def get_current_admin_info(current_admin: AuthenticatedAdmin = Depends(get_current_admin)):
     """Get current admin information"""
     return current_admin
 
 # Dashboard Routes
 @dashboard_router.get("/stats", response_model=DashboardStats)
 async def get_dashboard_stats(
+    recent_view: str = "full",
     db: Session = Depends(get_db),
-    current_admin: AdminModel = Depends(get_current_admin)
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
 ):
-    """Get dashboard statistics"""
+    """Get dashboard statistics
+    
+    `recent_view=summary` returns the recent orders as slim OrderSummary rows.
+    """
     # Get order counts by status
     total_orders = db.query(OrderModel).count()
     pending_orders = db.query(OrderModel).filter(OrderModel.status == "pending").count()
@@ -379,7 +777,18 @@ async def get_dashboard_stats(
     total_customers = db.query(CustomerModel).count()
     
     # Get recent orders (last 10)
-    recent_orders = db.query(OrderModel).order_by(desc(OrderModel.order_date)).limit(10).all()
+    if recent_view == "summary":
+        recent_orders = [
+            OrderSummary.model_validate(row)
+            for row in _order_projection_query(db, ORDER_SUMMARY_FIELDS).order_by(desc(OrderModel.order_date)).limit(10)
+        ]
+    elif recent_view == "full":
+        recent_orders = db.query(OrderModel).options(
+            selectinload(OrderModel.customer),
+            selectinload(OrderModel.product)
+        ).order_by(desc(OrderModel.order_date)).limit(10).all()
+    else:
+        raise HTTPException(status_code=400, detail="recent_view must be 'full' or 'summary'")
     
     return DashboardStats(
         total_orders=total_orders,
@@ -393,98 +802,357 @@ async def get_dashboard_stats(
         recent_orders=recent_orders
     )
 
+# Search Routes
+SEARCH_MAX_LIMIT = 100
+
+def _search_terms(q: str) -> List[str]:
+    terms = search_index.search_terms(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail="q must contain at least one search term")
+    return terms
+
+def _ranked_ids(db: Session, ranked, skip: int, limit: int) -> List[int]:
+    """One page of ids from an (id, score) subquery, best match first"""
+    statement = select(ranked.c.id).order_by(ranked.c.score.desc(), ranked.c.id.desc()).offset(skip).limit(limit)
+    return list(db.execute(statement).scalars())
+
+@search_router.get("/products", response_model=List[Product])
+async def search_products(
+    q: str,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=SEARCH_MAX_LIMIT),
+    db: Session = Depends(get_db)
+):
+    """Search active products by name and description, best match first"""
+    matched = search_index.matches(search_index.search_backend(db.get_bind()), "products", _search_terms(q))
+    ranked = select(matched.c.id, matched.c.score).join(
+        ProductModel, ProductModel.id == matched.c.id
+    ).where(ProductModel.is_active == True).subquery()
+    page = _ranked_ids(db, ranked, skip, limit)
+    products = {product.id: product for product in db.query(ProductModel).filter(ProductModel.id.in_(page))} if page else {}
+    return _json_list_response(product_list_adapter, [products[product_id] for product_id in page if product_id in products])
+
+@search_router.get("/orders", response_model=Union[List[Order], List[OrderSummary], OrderListCompact, List[Dict[str, Any]]])
+async def search_orders(
+    q: str,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=SEARCH_MAX_LIMIT),
+    view: str = "full",
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
+):
+    """Search orders by customer name, email or phone, or by order notes (Admin only)
+    
+    Every term must match the customer or the order's special requirements
+    and delivery address, so "rahim wall" finds Rahim's wall-mount orders.
+    Results are ranked, and take the same `view` and `fields` options as
+    `GET /api/orders/`.
+    """
+    terms = _search_terms(q)
+    backend = search_index.search_backend(db.get_bind())
+    # Orders matching each term through their own text or their customer's
+    term_matches = []
+    for index, term in enumerate(terms):
+        order_matches = search_index.matches(backend, "orders", [term], name=f"orders_matches_{index}")
+        customer_matches = search_index.matches(backend, "customers", [term], name=f"customers_matches_{index}")
+        term_matches += [
+            select(order_matches.c.id, order_matches.c.score, literal(index).label("term")),
+            select(OrderModel.id, customer_matches.c.score, literal(index).label("term")).join(
+                customer_matches, OrderModel.customer_id == customer_matches.c.id
+            ),
+        ]
+    combined = union_all(*term_matches).subquery()
+    per_term = select(
+        combined.c.id, combined.c.term, func.max(combined.c.score).label("score")
+    ).group_by(combined.c.id, combined.c.term).subquery()
+    ranked = select(per_term.c.id, func.sum(per_term.c.score).label("score")).group_by(
+        per_term.c.id
+    ).having(func.count() == len(terms)).subquery()
+    page = _ranked_ids(db, ranked, skip, limit)
+    
+    order_by = [case({order_id: position for position, order_id in enumerate(page)}, value=OrderModel.id)] if page else []
+    return _order_list_response(db, view, fields, [OrderModel.id.in_(page)], order_by, 0, max(len(page), 1))
+
+@search_router.get("/chat", response_model=List[ChatSearchResult])
+async def search_chat_messages(
+    q: str,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=SEARCH_MAX_LIMIT),
+    db: Session = Depends(get_db),
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
+):
+    """Search chat transcripts, customer messages and bot responses alike (Admin only)"""
+    matched = search_index.matches(search_index.search_backend(db.get_bind()), "chat_messages", _search_terms(q))
+    messages = db.query(ChatMessageModel).join(matched, matched.c.id == ChatMessageModel.id).order_by(
+        matched.c.score.desc(), ChatMessageModel.id.desc()
+    ).offset(skip).limit(limit).all()
+    return _json_list_response(chat_search_result_list_adapter, messages)
+
 # File Management Routes (Admin Only)
+async def _store_upload(file: UploadFile, file_type: str, db: Session) -> dict:
+    """Stream an upload to content-addressed storage, reusing identical files"""
+    try:
+        staged = await media_service.stage_upload(file, file_type)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    return await _record_upload(staged, file.filename, file.content_type, db)
+
+async def _record_upload(staged: dict, original_filename: str, content_type: str, db: Session) -> dict:
+    """Keep a staged upload unless identical bytes are already stored"""
+    asset = db.query(MediaAssetModel).filter(MediaAssetModel.sha256 == staged["sha256"]).first()
+    duplicate = asset is not None and media_service.exists(asset.file_type, asset.filename)
+    
+    if duplicate:
+        await media_service.discard_upload(staged)
+    else:
+        filename = await media_service.commit_upload(staged)
+        metadata = await asyncio.to_thread(
+            media_service.probe_media,
+            media_service.upload_dir(staged["file_type"]) / filename,
+            staged["file_type"]
+        )
+        if asset is None:
+            asset = MediaAssetModel(sha256=staged["sha256"])
+            db.add(asset)
+        asset.file_type = staged["file_type"]
+        asset.filename = filename
+        asset.original_filename = original_filename
+        asset.content_type = content_type
+        asset.size = staged["size"]
+        asset.width = metadata["width"]
+        asset.height = metadata["height"]
+        asset.duration = metadata["duration"]
+        db.commit()
+        db.refresh(asset)
+    
+    return {
+        "filename": asset.filename,
+        "original_filename": original_filename,
+        "url": media_service.media_url(asset.file_type, asset.filename),
+        "size": asset.size,
+        "sha256": asset.sha256,
+        "duplicate": duplicate
+    }
+
 @files_router.post("/upload-image")
 async def admin_upload_image(
     file: UploadFile = File(...),
-    current_admin: AdminModel = Depends(get_current_admin)
+    db: Session = Depends(get_db),
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
 ):
     """Upload image file (Admin only)"""
     if not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
     
-    # Create upload directory
-    upload_dir = Path("static/images")
-    upload_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Generate unique filename
-    file_extension = Path(file.filename).suffix
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = upload_dir / unique_filename
-    
-    # Save file
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    return {
-        "filename": unique_filename,
-        "original_filename": file.filename,
-        "url": f"/static/images/{unique_filename}",
-        "message": "Image uploaded successfully"
-    }
+    result = await _store_upload(file, "images", db)
+    result["message"] = "Image uploaded successfully"
+    return result
 
 @files_router.post("/upload-video")
 async def admin_upload_video(
     file: UploadFile = File(...),
-    current_admin: AdminModel = Depends(get_current_admin)
+    db: Session = Depends(get_db),
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
 ):
     """Upload video file (Admin only)"""
     if not file.content_type.startswith("video/"):
         raise HTTPException(status_code=400, detail="File must be a video")
     
-    # Create upload directory
-    upload_dir = Path("static/videos")
-    upload_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Generate unique filename
-    file_extension = Path(file.filename).suffix
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = upload_dir / unique_filename
-    
-    # Save file
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    result = await _store_upload(file, "videos", db)
+    result["message"] = "Video uploaded successfully"
+    return result
+
+@files_router.get("/by-hash/{sha256}")
+async def get_file_by_hash(
+    sha256: str,
+    db: Session = Depends(get_db),
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
+):
+    """Look up already stored media by SHA-256 so clients can skip re-uploading (Admin only)"""
+    asset = db.query(MediaAssetModel).filter(MediaAssetModel.sha256 == sha256.lower()).first()
+    if asset is None or not media_service.exists(asset.file_type, asset.filename):
+        raise HTTPException(status_code=404, detail="File not found")
     
     return {
-        "filename": unique_filename,
-        "original_filename": file.filename,
-        "url": f"/static/videos/{unique_filename}",
-        "message": "Video uploaded successfully"
+        "filename": asset.filename,
+        "url": media_service.media_url(asset.file_type, asset.filename),
+        "size": asset.size,
+        "sha256": asset.sha256
     }
 
+@files_router.post("/uploads")
+async def create_resumable_upload(
+    upload: ResumableUploadCreate,
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
+):
+    """Start a resumable upload (Admin only)"""
+    if upload.file_type not in ["images", "videos"]:
+        raise HTTPException(status_code=400, detail="File type must be 'images' or 'videos'")
+    
+    expected_prefix = "image/" if upload.file_type == "images" else "video/"
+    if upload.content_type and not upload.content_type.startswith(expected_prefix):
+        raise HTTPException(status_code=400, detail=f"File must be {'an image' if upload.file_type == 'images' else 'a video'}")
+    
+    try:
+        return await media_service.create_resumable_upload(
+            upload.file_type,
+            upload.filename,
+            upload.total_size,
+            upload.content_type
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+@files_router.get("/uploads/{upload_id}")
+async def get_resumable_upload(
+    upload_id: str,
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
+):
+    """Get the received byte ranges of a resumable upload (Admin only)"""
+    try:
+        return await media_service.get_resumable_upload(upload_id)
+    except UploadNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+@files_router.put("/uploads/{upload_id}")
+async def upload_chunk(
+    upload_id: str,
+    offset: int,
+    request: Request,
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
+):
+    """Upload one chunk of a resumable upload as the raw request body (Admin only)
+    
+    Chunks may be sent in any order and in parallel; `offset` is the byte
+    position of the chunk within the file.
+    """
+    try:
+        return await media_service.write_chunk(upload_id, offset, request.stream())
+    except UploadNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except InvalidChunkError as e:
+        raise HTTPException(status_code=416, detail=str(e))
+
+@files_router.post("/uploads/{upload_id}/complete")
+async def complete_resumable_upload(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
+):
+    """Finalize a resumable upload once all chunks have arrived (Admin only)"""
+    try:
+        staged = await media_service.finalize_resumable_upload(upload_id)
+    except UploadNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except UploadIncompleteError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    result = await _record_upload(staged, staged["original_filename"], staged["content_type"], db)
+    result["message"] = "File uploaded successfully"
+    return result
+
+@files_router.delete("/uploads/{upload_id}")
+async def abort_resumable_upload(
+    upload_id: str,
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
+):
+    """Abort a resumable upload and discard received chunks (Admin only)"""
+    try:
+        await media_service.abort_resumable_upload(upload_id)
+    except UploadNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return {"message": f"Upload {upload_id} aborted"}
+
+MEDIA_SORT_COLUMNS = {
+    "created_at": MediaAssetModel.created_at,
+    "size": MediaAssetModel.size,
+    "filename": MediaAssetModel.filename,
+    "duration": MediaAssetModel.duration,
+}
+
 @files_router.get("/list/{file_type}")
 async def list_files(
     file_type: str,
-    current_admin: AdminModel = Depends(get_current_admin)
+    skip: int = 0,
+    limit: int = 50,
+    sort_by: str = "created_at",
+    order: str = "desc",
+    db: Session = Depends(get_db),
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
 ):
-    """List all files of specified type (Admin only)"""
+    """List files of specified type from the media library (Admin only)"""
     if file_type not in ["images", "videos"]:
         raise HTTPException(status_code=400, detail="File type must be 'images' or 'videos'")
     
-    directory = Path(f"static/{file_type}")
-    if not directory.exists():
-        return {"files": []}
+    if sort_by not in MEDIA_SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"sort_by must be one of: {', '.join(MEDIA_SORT_COLUMNS)}")
+    
+    if order not in ["asc", "desc"]:
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
+    
+    limit = max(1, min(limit, 200))
+    direction = desc if order == "desc" else asc
+    query = db.query(MediaAssetModel).filter(MediaAssetModel.file_type == file_type)
+    total = query.count()
+    assets = query.order_by(
+        direction(MEDIA_SORT_COLUMNS[sort_by]),
+        direction(MediaAssetModel.id)
+    ).offset(skip).limit(limit).all()
+    
+    # Referencing products for the whole page in one query
+    product_ids = {asset.id: [] for asset in assets}
+    if assets:
+        links = db.query(ProductMediaModel).filter(ProductMediaModel.media_id.in_(product_ids.keys()))
+        for link in links:
+            product_ids[link.media_id].append(link.product_id)
     
     files = []
-    for file_path in directory.iterdir():
-        if file_path.is_file():
-            stat_info = file_path.stat()
-            files.append({
-                "filename": file_path.name,
-                "url": f"/static/{file_type}/{file_path.name}",
-                "size": stat_info.st_size,
-                "created": stat_info.st_ctime
-            })
-    
-    return {"files": sorted(files, key=lambda x: x['created'], reverse=True)}
+    for asset in assets:
+        files.append({
+            "filename": asset.filename,
+            "url": media_service.media_url(asset.file_type, asset.filename),
+            "size": asset.size,
+            "width": asset.width,
+            "height": asset.height,
+            "duration": asset.duration,
+            "sha256": asset.sha256,
+            "created": asset.created_at.timestamp() if asset.created_at else None,
+            "product_ids": sorted(product_ids[asset.id])
+        })
+    
+    return {"files": files, "total": total, "skip": skip, "limit": limit}
+
+@files_router.post("/reconcile")
+async def reconcile_media_library(
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
+):
+    """Index media files added or removed outside the API (Admin only)"""
+    report = await asyncio.to_thread(media_library.reconcile)
+    return {"message": "Media library reconciled", **report}
+
+@files_router.post("/gc")
+async def collect_media_garbage(
+    dry_run: bool = False,
+    grace_period_hours: float = None,
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
+):
+    """Quarantine media no product references and delete expired quarantine (Admin only)"""
+    return await asyncio.to_thread(media_gc.collect_garbage, dry_run, grace_period_hours)
 
 @files_router.delete("/delete/{file_type}/{filename}")
 async def delete_file(
     file_type: str,
     filename: str,
-    current_admin: AdminModel = Depends(get_current_admin)
+    force: bool = False,
+    db: Session = Depends(get_db),
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
 ):
-    """Delete a file (Admin only)"""
+    """Delete a file (Admin only)
+    
+    Files still used by a product are kept unless `force` is set.
+    """
     if file_type not in ["images", "videos"]:
         raise HTTPException(status_code=400, detail="File type must be 'images' or 'videos'")
     
@@ -493,8 +1161,22 @@ async def delete_file(
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="File not found")
     
+    product_ids = media_gc.referencing_product_ids(db, file_type, filename)
+    if product_ids and not force:
+        raise HTTPException(
+            status_code=409,
+            detail=f"File is used by product(s) {', '.join(map(str, product_ids))}"
+        )
+    
     try:
         file_path.unlink()
+        asset = db.query(MediaAssetModel).filter(
+            MediaAssetModel.file_type == file_type,
+            MediaAssetModel.filename == filename
+        ).first()
+        if asset:
+            db.delete(asset)
+            db.commit()
         return {"message": f"File {filename} deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting file: {str(e)}")
@@ -505,7 +1187,7 @@ async def update_product_media(
     images: List[str] = None,
     video_url: str = None,
     db: Session = Depends(get_db),
-    current_admin: AdminModel = Depends(get_current_admin)
+    current_admin: AuthenticatedAdmin = Depends(get_current_admin)
 ):
     """Update product images and video (Admin only)"""
     product = db.query(ProductModel).filter(ProductModel.id == product_id).first()
@@ -518,6 +1200,7 @@ async def update_product_media(
     if video_url is not None:
         product.video_url = video_url
     
+    media_library.sync_product_media(db, product)
     db.commit()
     db.refresh(product)
     
@@ -526,4 +1209,21 @@ async def update_product_media(
         "product_id": product_id,
         "images": product.images,
         "video_url": product.video_url
-    }
\ No newline at end of file
+    }
+
+# Media Routes
+@media_router.get("/{file_type}/{filename}")
+@media_router.head("/{file_type}/{filename}")
+async def serve_media(file_type: str, filename: str, request: Request):
+    """Serve an image or video with HTTP Range support for seeking"""
+    if file_type not in ["images", "videos"]:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    if "/" in filename or "\\" in filename or filename.startswith("."):
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    file_path = media_service.upload_dir(file_type) / filename
+    if not file_path.is_file():
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    return RangeFileResponse(file_path, file_path.stat(), request.headers)
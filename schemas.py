@@ -1,7 +1,9 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import Optional, List, Dict, Any, Union
 from datetime import datetime
 
+from services.asset_manifest import static_manifest
+
 # Product Schemas
 class ProductBase(BaseModel):
     name: str
@@ -12,8 +14,14 @@ class ProductBase(BaseModel):
     video_url: Optional[str] = None
     stock_quantity: int = 1
 
+def _original_media_urls(value):
+    """Store media by its on-disk URL rather than a fingerprinted one"""
+    if isinstance(value, list):
+        return [static_manifest.original_url(url) for url in value]
+    return static_manifest.original_url(value)
+
 class ProductCreate(ProductBase):
-    pass
+    _original_media_urls = field_validator("images", "video_url")(_original_media_urls)
 
 class ProductUpdate(BaseModel):
     name: Optional[str] = None
@@ -24,6 +32,23 @@ class ProductUpdate(BaseModel):
     video_url: Optional[str] = None
     stock_quantity: Optional[int] = None
     is_active: Optional[bool] = None
+    
+    _original_media_urls = field_validator("images", "video_url")(_original_media_urls)
+
+class ProductImportRow(ProductCreate):
+    """One record of a product import; rows with an id update that product"""
+    id: Optional[int] = None
+    is_active: Optional[bool] = None
+
+class ProductImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+class ProductImportResult(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    errors: List[ProductImportError]
 
 class Product(ProductBase):
     id: int
@@ -31,6 +56,20 @@ class Product(ProductBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     
+    @field_validator("images")
+    @classmethod
+    def fingerprint_images(cls, images):
+        """Serve images through their fingerprinted, immutable URLs"""
+        if images is None:
+            return images
+        return [static_manifest.resolve_url(url) for url in images]
+    
+    @field_validator("video_url")
+    @classmethod
+    def fingerprint_video_url(cls, video_url):
+        """Serve the video through its fingerprinted, immutable URL"""
+        return static_manifest.resolve_url(video_url)
+    
     class Config:
         from_attributes = True
 
@@ -68,6 +107,16 @@ class OrderUpdate(BaseModel):
     special_requirements: Optional[str] = None
     delivery_address: Optional[str] = None
 
+class OrderBulkUpdate(BaseModel):
+    order_ids: List[int] = Field(min_length=1, max_length=500)
+    status: str
+
+class OrderBulkUpdateResult(BaseModel):
+    status: str
+    updated: List[int]
+    unchanged: List[int]
+    not_found: List[int]
+
 class Order(OrderBase):
     id: int
     customer_id: int
@@ -82,6 +131,25 @@ class Order(OrderBase):
     class Config:
         from_attributes = True
 
+class OrderCompact(OrderBase):
+    """Order without its embedded product; see OrderListCompact"""
+    id: int
+    customer_id: int
+    product_id: int
+    total_price: float
+    status: str
+    order_date: datetime
+    updated_at: Optional[datetime] = None
+    customer: Customer
+    
+    class Config:
+        from_attributes = True
+
+class OrderListCompact(BaseModel):
+    """Orders with each referenced product included once, keyed by id"""
+    orders: List[OrderCompact]
+    products: Dict[int, Product]
+
 # Chat Schemas
 class ChatMessageCreate(BaseModel):
     message: str
@@ -102,6 +170,9 @@ class ChatMessage(BaseModel):
     class Config:
         from_attributes = True
 
+class ChatSearchResult(ChatMessage):
+    session_id: str
+
 class ChatSession(BaseModel):
     id: int
     session_id: str
@@ -137,6 +208,16 @@ class Token(BaseModel):
     token_type: str
 
 # Dashboard Schemas
+class OrderSummary(BaseModel):
+    id: int
+    customer_name: str
+    total_price: float
+    status: str
+    order_date: datetime
+    
+    class Config:
+        from_attributes = True
+
 class DashboardStats(BaseModel):
     total_orders: int
     pending_orders: int
@@ -146,14 +227,11 @@ class DashboardStats(BaseModel):
     cancelled_orders: int
     total_revenue: float
     total_customers: int
-    recent_orders: List[Order]
-
-class OrderSummary(BaseModel):
-    id: int
-    customer_name: str
-    total_price: float
-    status: str
-    order_date: datetime
-    
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    recent_orders: List[Union[Order, OrderSummary]]
+
+# Media Schemas
+class ResumableUploadCreate(BaseModel):
+    file_type: str
+    filename: str
+    total_size: int = Field(gt=0)
+    content_type: Optional[str] = None
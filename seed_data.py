@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator for performance testing.
+
+Bulk-generates customers, orders, chat sessions and chat messages so the
+pagination, dashboard and history endpoints can be exercised at
+production scale. Output is deterministic for a given --seed. Rows are
+written with COPY on PostgreSQL and executemany on SQLite.
+
+    python seed_data.py --orders 1000000 --customers 200000 --chat-messages 5000000
+
+Never run this against a production database.
+"""
+
+from datetime import datetime, timedelta, timezone
+import argparse
+import csv
+import io
+import json
+import random
+import time
+import uuid
+
+from sqlalchemy import func, select, text
+from database import engine
+from models import Base, Product, Customer, Order, ChatSession, ChatMessage
+
+FIRST_NAMES = [
+    "Rahim", "Karim", "Fatima", "Ayesha", "Tanvir", "Nusrat", "Sabbir", "Farhana", "Imran", "Sadia",
+    "Arif", "Mitu", "Rakib", "Jannat", "Hasan", "Tasnim", "Mehedi", "Sumaiya", "Shakil", "Anika",
+]
+LAST_NAMES = [
+    "Ahmed", "Hossain", "Rahman", "Islam", "Khan", "Chowdhury", "Akter", "Uddin", "Sarker", "Mia",
+    "Haque", "Begum", "Alam", "Karim", "Das", "Roy", "Siddique", "Talukder", "Bhuiyan", "Sheikh",
+]
+CITIES = ["Dhaka", "Chattogram", "Khulna", "Rajshahi", "Sylhet", "Barishal", "Rangpur", "Mymensingh", "Cumilla", "Gazipur"]
+SIZES = ["65\"", "75\"", "86\"", "98\"", "100\"", "105\"", "110\""]
+SPECIAL_REQUIREMENTS = ["Wall mount installation", "Mobile stand", "Deliver after 5 PM", "Need training session", "OPS PC module"]
+CHAT_QUESTIONS = [
+    ("What are the specifications?", "en"),
+    ("How much does the 86 inch model cost?", "en"),
+    ("How can I place an order?", "en"),
+    ("Do you deliver outside Dhaka?", "en"),
+    ("Is installation included?", "en"),
+    ("দাম কত?", "bn"),
+    ("অর্ডার কিভাবে করব?", "bn"),
+]
+CHAT_RESPONSE = "Thank you for your interest in the SmartTech Interactive Smart Board RK3588. Contact 01678-134547 for pricing and orders."
+
+STATUSES = ["pending", "confirmed", "shipped", "delivered", "cancelled"]
+# Status mix by order age: new orders are mostly pending, old ones delivered
+STATUS_WEIGHTS_BY_AGE = [
+    (2, [70, 25, 3, 0, 2]),
+    (7, [15, 40, 35, 5, 5]),
+    (30, [3, 10, 25, 55, 7]),
+    (None, [0, 1, 2, 88, 9]),
+]
+
+
+def _status_for_age(rng: random.Random, age_days: float) -> str:
+    for max_age, weights in STATUS_WEIGHTS_BY_AGE:
+        if max_age is None or age_days < max_age:
+            return rng.choices(STATUSES, weights)[0]
+
+
+def _random_age_days(rng: random.Random, days: int) -> float:
+    # Skewed towards recent dates, like a growing shop
+    return days * (1 - rng.random() ** 0.5)
+
+
+def _next_id(conn, model) -> int:
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def generate_products(rng: random.Random, count: int, first_id: int, now: datetime):
+    for offset in range(count):
+        size = SIZES[offset % len(SIZES)]
+        yield {
+            "id": first_id + offset,
+            "name": f"SmartTech Interactive Smart Board RK3588 {size}" + (f" (Series {offset // len(SIZES) + 1})" if offset >= len(SIZES) else ""),
+            "description": "Interactive smart board with RK3588 processor, Android 12, 16GB RAM and 256GB storage.",
+            "price": round(2500 + SIZES.index(size) * 750 + rng.uniform(-100, 100), 2),
+            "specifications": {"processor": "RK3588", "operating_system": "Android 12", "ram": "16GB", "storage": "256GB", "size": size},
+            "images": [],
+            "video_url": None,
+            "stock_quantity": rng.randint(0, 200),
+            "is_active": rng.random() > 0.05,
+            "created_at": now - timedelta(days=rng.randint(0, 900)),
+        }
+
+
+def generate_customers(rng: random.Random, count: int, first_id: int, now: datetime, days: int):
+    for customer_id in range(first_id, first_id + count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        city = rng.choice(CITIES)
+        yield (
+            customer_id,
+            f"{first} {last}",
+            f"{first.lower()}.{last.lower()}{customer_id}@example.com",
+            f"01{rng.randint(3, 9)}{rng.randint(10000000, 99999999)}",
+            f"House {rng.randint(1, 200)}, Road {rng.randint(1, 50)}",
+            city,
+            "Bangladesh",
+            now - timedelta(days=_random_age_days(rng, days)),
+        )
+
+
+def generate_orders(rng: random.Random, count: int, first_id: int, customer_ids: range, products: list, now: datetime, days: int):
+    for order_id in range(first_id, first_id + count):
+        product_id, price = rng.choice(products)
+        quantity = rng.choices([1, 2, 3, 5, 10], [70, 15, 8, 5, 2])[0]
+        age_days = _random_age_days(rng, days)
+        order_date = now - timedelta(days=age_days)
+        status = _status_for_age(rng, age_days)
+        yield (
+            order_id,
+            rng.randint(customer_ids.start, customer_ids.stop - 1),
+            product_id,
+            quantity,
+            round(price * quantity, 2),
+            status,
+            rng.choice(SPECIAL_REQUIREMENTS) if rng.random() < 0.2 else None,
+            f"House {rng.randint(1, 200)}, Road {rng.randint(1, 50)}, {rng.choice(CITIES)}",
+            order_date,
+            order_date + timedelta(hours=rng.randint(1, 72)) if status != "pending" else None,
+        )
+
+
+def generate_chat(rng: random.Random, sessions: int, messages: int, first_session_id: int, first_message_id: int,
+                  customer_ids: range, now: datetime, days: int):
+    """Yield ("session", row) and ("message", row) tuples, messages spread unevenly over sessions"""
+    message_id = first_message_id
+    remaining = messages
+    for index in range(sessions):
+        session_key = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        customer_id = rng.randint(customer_ids.start, customer_ids.stop - 1) if customer_ids and rng.random() < 0.3 else None
+        started = now - timedelta(days=_random_age_days(rng, days))
+        yield "session", (first_session_id + index, customer_id, session_key, started)
+
+        sessions_left = sessions - index
+        mean = remaining / sessions_left
+        count = remaining if sessions_left == 1 else min(remaining, max(1, int(rng.expovariate(1 / mean)))) if mean >= 1 else 0
+        remaining -= count
+        timestamp = started
+        for _ in range(count):
+            question, language = rng.choice(CHAT_QUESTIONS)
+            timestamp += timedelta(seconds=rng.randint(5, 120))
+            yield "message", (message_id, session_key, question, CHAT_RESPONSE, language, timestamp)
+            message_id += 1
+
+
+class BulkWriter:
+    """Buffer rows per table and flush them with COPY (PostgreSQL) or executemany"""
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self.dialect = engine.dialect.name
+        self.connection = engine.raw_connection()
+        self.buffers = {}
+        self.counts = {}
+        if self.dialect == "sqlite":
+            cursor = self.connection.cursor()
+            cursor.execute("PRAGMA synchronous = OFF")
+            cursor.close()
+
+    def add(self, table, columns, row):
+        buffer = self.buffers.setdefault(table.name, (table, columns, []))[2]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush(table.name)
+
+    def flush(self, table_name: str = None):
+        for name in [table_name] if table_name else list(self.buffers):
+            table, columns, rows = self.buffers[name]
+            if not rows:
+                continue
+            cursor = self.connection.cursor()
+            try:
+                if self.dialect == "postgresql":
+                    self._copy(cursor, table, columns, rows)
+                else:
+                    placeholder = "?" if self.dialect == "sqlite" else "%s"
+                    cursor.executemany(
+                        f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join([placeholder] * len(columns))})",
+                        [self._adapt(row) for row in rows] if self.dialect == "sqlite" else rows
+                    )
+            finally:
+                cursor.close()
+            self.connection.commit()
+            self.counts[name] = self.counts.get(name, 0) + len(rows)
+            rows.clear()
+
+    @staticmethod
+    def _adapt(row):
+        # SQLAlchemy stores SQLite datetimes as naive ISO strings
+        return tuple(
+            value.astimezone(timezone.utc).replace(tzinfo=None).isoformat(sep=" ") if isinstance(value, datetime) else value
+            for value in row
+        )
+
+    @staticmethod
+    def _copy(cursor, table, columns, rows):
+        data = io.StringIO()
+        writer = csv.writer(data)
+        for row in rows:
+            writer.writerow(["\\N" if value is None else value.isoformat() if isinstance(value, datetime) else value for value in row])
+        data.seek(0)
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            data
+        )
+
+    def close(self):
+        self.flush()
+        if self.dialect == "postgresql":
+            # Explicit ids bypass the sequences; move them past the new rows
+            cursor = self.connection.cursor()
+            for name in self.counts:
+                cursor.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), (SELECT COALESCE(MAX(id), 1) FROM {name}))"
+                )
+            cursor.close()
+            self.connection.commit()
+        self.connection.close()
+
+
+def seed(customers: int = 200_000, orders: int = 1_000_000, chat_sessions: int = 250_000,
+         chat_messages: int = 5_000_000, products: int = 7, days: int = 730, seed: int = 42,
+         batch_size: int = 50_000, reset: bool = False, verbose: bool = True) -> dict:
+    """Generate the dataset and write it. Existing rows are kept unless `reset` is set."""
+    rng = random.Random(seed)
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    if reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        first_product_id = _next_id(conn, Product)
+        product_rows = list(generate_products(rng, products, first_product_id, now))
+        if product_rows:
+            conn.execute(Product.__table__.insert(), product_rows)
+        product_prices = [(row["id"], row["price"]) for row in product_rows] or [
+            (product_id, price) for product_id, price in conn.execute(select(Product.id, Product.price))
+        ]
+        first_customer_id = _next_id(conn, Customer)
+        first_order_id = _next_id(conn, Order)
+        first_session_id = _next_id(conn, ChatSession)
+        first_message_id = _next_id(conn, ChatMessage)
+
+    if orders and not product_prices:
+        raise SystemExit("Orders need at least one product; pass --products")
+    customer_ids = range(first_customer_id, first_customer_id + customers)
+    if orders and not customers:
+        raise SystemExit("Orders need customers; pass --customers")
+
+    writer = BulkWriter(batch_size)
+    started = time.monotonic()
+    try:
+        customer_columns = ["id", "full_name", "email", "phone", "address", "city", "country", "created_at"]
+        for row in generate_customers(rng, customers, first_customer_id, now, days):
+            writer.add(Customer.__table__, customer_columns, row)
+        writer.flush()
+        if verbose:
+            print(f"✅ {customers} customers ({time.monotonic() - started:.1f}s)")
+
+        order_columns = ["id", "customer_id", "product_id", "quantity", "total_price", "status",
+                         "special_requirements", "delivery_address", "order_date", "updated_at"]
+        for row in generate_orders(rng, orders, first_order_id, customer_ids, product_prices, now, days):
+            writer.add(Order.__table__, order_columns, row)
+        writer.flush()
+        if verbose:
+            print(f"✅ {orders} orders ({time.monotonic() - started:.1f}s)")
+
+        session_columns = ["id", "customer_id", "session_id", "created_at"]
+        message_columns = ["id", "session_id", "message", "response", "language", "timestamp"]
+        for kind, row in generate_chat(rng, chat_sessions, chat_messages, first_session_id, first_message_id,
+                                       customer_ids, now, days):
+            if kind == "session":
+                writer.add(ChatSession.__table__, session_columns, row)
+            else:
+                writer.add(ChatMessage.__table__, message_columns, row)
+        writer.flush()
+        if verbose:
+            print(f"✅ {chat_sessions} chat sessions, {writer.counts.get('chat_messages', 0)} chat messages "
+                  f"({time.monotonic() - started:.1f}s)")
+    finally:
+        writer.close()
+
+    return {"products": len(product_rows), **writer.counts}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a large synthetic dataset for performance testing")
+    parser.add_argument("--customers", type=int, default=200_000)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--chat-sessions", type=int, default=250_000)
+    parser.add_argument("--chat-messages", type=int, default=5_000_000)
+    parser.add_argument("--products", type=int, default=7, help="Products to add (orders use existing ones when 0)")
+    parser.add_argument("--days", type=int, default=730, help="Spread orders and chats over this many days")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed; the same seed gives the same data")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="Rows per COPY/executemany batch")
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate ALL tables first (deletes all data)")
+    args = parser.parse_args()
+
+    print(f"🚀 Seeding {engine.url.render_as_string(hide_password=True)} ({engine.dialect.name})...")
+    counts = seed(
+        customers=args.customers,
+        orders=args.orders,
+        chat_sessions=args.chat_sessions,
+        chat_messages=args.chat_messages,
+        products=args.products,
+        days=args.days,
+        seed=args.seed,
+        batch_size=args.batch_size,
+        reset=args.reset,
+    )
+    print(f"✅ Seeding completed: {json.dumps(counts)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Static asset manifest: fingerprinted URLs and precompressed variants.
+
+`build()` walks the static directory, maps every file to a URL containing a
+hash of its contents (images/foo.jpg -> images/foo.1a2b3c4d5e6f.jpg) and
+writes .gz/.br siblings for compressible assets. Fingerprinted URLs change
+whenever the file does, so they can be cached forever.
+
+Only compressible assets are hashed by content. Content-addressed uploads
+already carry their hash, and other media (large images and videos) is
+fingerprinted by size and modification time, so a build never reads the
+media library.
+
+Run `python -m services.asset_manifest` as a build step; the app also
+rebuilds the manifest in the background on startup, reusing the entries of
+unchanged files.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from dotenv import load_dotenv
+import logging
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+from services.media_service import MEDIA_ROOT, is_content_addressed
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+MANIFEST_FILENAME = ".manifest.json"
+COMPRESSIBLE_EXTENSIONS = {
+    ".css", ".js", ".mjs", ".json", ".map", ".svg", ".html", ".htm",
+    ".txt", ".xml", ".ico", ".webmanifest", ".woff", ".ttf", ".otf",
+}
+PRECOMPRESSED_ENCODINGS = {"br": ".br", "gzip": ".gz"}
+# Files smaller than this are not worth a compressed copy
+MIN_COMPRESS_SIZE = int(os.getenv("STATIC_MIN_COMPRESS_SIZE", 1024))
+
+
+def is_compressible(path) -> bool:
+    """Whether a static file benefits from a precompressed variant"""
+    return Path(path).suffix.lower() in COMPRESSIBLE_EXTENSIONS
+
+
+def _hash_file(path: Path) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _stat_hash(stat_result: os.stat_result) -> str:
+    """Stand-in for a content hash that changes whenever the file is rewritten"""
+    return hashlib.sha256(f"{stat_result.st_size}-{stat_result.st_mtime_ns}".encode()).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes):
+    # A unique temp name, so concurrent builds (reloads, several workers) don't collide
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False) as f:
+        f.write(data)
+    try:
+        os.replace(f.name, path)
+    except OSError:
+        os.unlink(f.name)
+        raise
+
+
+def _precompress(path: Path, stat_result: os.stat_result):
+    """Write .gz (and .br when available) siblings that are older than the source"""
+    if stat_result.st_size < MIN_COMPRESS_SIZE:
+        return
+    data = None
+    compressors = {".gz": lambda d: gzip.compress(d, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressors[".br"] = lambda d: brotli.compress(d, quality=11)
+
+    for suffix, compress in compressors.items():
+        sibling = path.with_name(path.name + suffix)
+        if sibling.exists() and sibling.stat().st_mtime >= stat_result.st_mtime:
+            continue
+        if data is None:
+            data = path.read_bytes()
+        compressed = compress(data)
+        # Keep the variant only when it actually saves bytes
+        if len(compressed) < len(data) * 0.9:
+            _write_atomic(sibling, compressed)
+        elif sibling.exists():
+            sibling.unlink()
+
+
+class StaticManifest:
+    def __init__(self, root: Path = MEDIA_ROOT):
+        self.root = Path(root)
+        self.files = {}
+        self.originals = {}
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / MANIFEST_FILENAME
+
+    def _set_files(self, files: dict):
+        self.files = files
+        self.originals = {entry["path"]: path for path, entry in files.items()}
+
+    def load(self):
+        """Load a previously built manifest from disk"""
+        try:
+            with open(self.manifest_path) as f:
+                self._set_files(json.load(f)["files"])
+        except (OSError, ValueError, KeyError):
+            self._set_files({})
+
+    def build(self) -> dict:
+        """Fingerprint and precompress every static file, then save the manifest"""
+        self.load()
+        previous = self.files
+        files = {}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for filename in filenames:
+                if filename.startswith(".") or filename.endswith((".gz", ".br")):
+                    continue
+                path = Path(dirpath) / filename
+                rel_path = path.relative_to(self.root).as_posix()
+                stat_result = path.stat()
+
+                entry = previous.get(rel_path)
+                if not entry or entry["size"] != stat_result.st_size or entry["mtime"] != stat_result.st_mtime:
+                    if is_content_addressed(filename):
+                        digest = path.stem
+                        fingerprinted = rel_path
+                    else:
+                        digest = _hash_file(path) if is_compressible(filename) else _stat_hash(stat_result)
+                        fingerprinted = str(Path(rel_path).with_name(
+                            f"{path.stem}.{digest[:12]}{path.suffix}"
+                        ).as_posix())
+                    entry = {
+                        "path": fingerprinted,
+                        "hash": digest,
+                        "size": stat_result.st_size,
+                        "mtime": stat_result.st_mtime,
+                    }
+                files[rel_path] = entry
+
+                if is_compressible(filename):
+                    _precompress(path, stat_result)
+
+        self._set_files(files)
+        _write_atomic(self.manifest_path, json.dumps({"files": files}, indent=2).encode())
+        logger.info(f"Static manifest built with {len(files)} files")
+        return files
+
+    def original_path(self, path: str):
+        """Map a fingerprinted path back to the file on disk, or None"""
+        original = self.originals.get(path)
+        return original if original != path else None
+
+    def resolve_url(self, url: str) -> str:
+        """Rewrite a /static/ URL to its fingerprinted form when it is known"""
+        if not url or not url.startswith("/static/"):
+            return url
+        entry = self.files.get(url[len("/static/"):])
+        return f"/static/{entry['path']}" if entry else url
+
+    def original_url(self, url: str) -> str:
+        """Undo `resolve_url`, giving the URL of the file as stored"""
+        if not url or not url.startswith("/static/"):
+            return url
+        original = self.original_path(url[len("/static/"):])
+        return f"/static/{original}" if original else url
+
+
+static_manifest = StaticManifest()
+static_manifest.load()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    static_manifest.build()
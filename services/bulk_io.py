@@ -0,0 +1,151 @@
+"""
+Streaming CSV and NDJSON for the bulk import and export endpoints.
+
+Exports encode rows a chunk at a time as they come off the cursor.
+Imports decode the request body as it arrives, one record at a time, so
+neither side holds the whole file in memory.
+"""
+
+from datetime import date, datetime
+import codecs
+import csv
+import io
+import json
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Rows encoded per chunk written to the response
+ROWS_PER_CHUNK = 500
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def encode_rows(rows, columns: list, format: str):
+    """Yield `rows` (mappings) as CSV with a header line, or as NDJSON, in byte chunks"""
+    if format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for index, row in enumerate(rows, 1):
+            writer.writerow([_csv_cell(row[column]) for column in columns])
+            if index % ROWS_PER_CHUNK == 0:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode()
+        return
+
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({column: row[column] for column in columns}, default=_json_default, ensure_ascii=False))
+        if len(lines) >= ROWS_PER_CHUNK:
+            yield ("\n".join(lines) + "\n").encode()
+            lines.clear()
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+async def _lines(chunks):
+    """Split a stream of byte chunks into text lines (line endings kept)"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.splitlines(keepends=True)
+        pending = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def _csv_records(chunks):
+    """Complete CSV records, joining lines that end inside a quoted field"""
+    record = ""
+    async for line in _lines(chunks):
+        record += line
+        # An odd number of quotes means a quoted field continues on the next line
+        if record.count('"') % 2 == 0:
+            yield record
+            record = ""
+    if record:
+        yield record
+
+
+async def parse_rows(chunks, format: str, json_columns=()):
+    """Yield (row_number, record, error) for each record in a streamed CSV or NDJSON body
+
+    Row numbers count data records from 1 (the CSV header is not counted).
+    Empty CSV cells are left out of the record, and `json_columns` cells are
+    decoded as JSON. A record that can't be parsed comes back with an error
+    message instead.
+    """
+    row_number = 0
+    if format == "ndjson":
+        async for line in _lines(chunks):
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield row_number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield row_number, None, "Each line must be a JSON object"
+                continue
+            yield row_number, record, None
+        return
+
+    header = None
+    async for text in _csv_records(chunks):
+        if not text.strip():
+            continue
+        try:
+            cells = next(csv.reader([text]))
+        except csv.Error as e:
+            cells, error = None, f"Invalid CSV: {e}"
+        if header is None:
+            if cells is None:
+                yield 0, None, f"Unreadable header: {error}"
+                return
+            header = [cell.strip() for cell in cells]
+            continue
+        row_number += 1
+        if cells is None:
+            yield row_number, None, error
+            continue
+        if len(cells) != len(header):
+            yield row_number, None, f"Expected {len(header)} columns, got {len(cells)}"
+            continue
+        record = {}
+        error = None
+        for column, cell in zip(header, cells):
+            if cell == "":
+                continue
+            if column in json_columns:
+                try:
+                    cell = json.loads(cell)
+                except ValueError:
+                    error = f"{column}: invalid JSON"
+                    break
+            record[column] = cell
+        yield row_number, (None if error else record), error
@@ -4,6 +4,9 @@ from dotenv import load_dotenv
 import json
 import asyncio
 import time
+import logging
+
+logger = logging.getLogger(__name__)
 
 load_dotenv()
 
@@ -24,11 +27,11 @@ class ChatbotService:
             os.getenv("OPENROUTER_MODEL_FALLBACK", "google/gemma-2-9b-it:free")
         ]
         self.current_model_index = 0
-        self.base_url = "https://openrouter.ai/api/v1/chat/completions"
+        # Overridable so benchmarks can point at a local stand-in
+        api_base = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1").rstrip("/")
+        self.base_url = f"{api_base}/chat/completions"
         
-        # Print debug information
-        print(f"OpenRouter API Keys loaded: {len([key for key in self.api_keys if key])}")
-        print(f"OpenRouter Models: {self.models}")
+        logger.info(f"OpenRouter API keys loaded: {len([key for key in self.api_keys if key])}, models: {self.models}")
         
         # System prompt for the chatbot
         self.system_prompt = """[SYSTEM INSTRUCTIONS - FOLLOW EXACTLY]
@@ -74,7 +77,7 @@ Always encourage interested customers to contact 01678-134547."""
         valid_keys = [key for key in self.api_keys if key]
         if valid_keys:
             self.current_key_index = (self.current_key_index + 1) % len(valid_keys)
-            print(f"Rotating to API key {self.current_key_index + 1}")
+            logger.info(f"Rotating to API key {self.current_key_index + 1}")
 
     def _get_current_model(self):
         """Get the current model"""
@@ -83,7 +86,7 @@ Always encourage interested customers to contact 01678-134547."""
     def _rotate_model(self):
         """Rotate to the next model"""
         self.current_model_index = (self.current_model_index + 1) % len(self.models)
-        print(f"Rotating to model {self.current_model_index + 1}: {self._get_current_model()}")
+        logger.info(f"Rotating to model {self.current_model_index + 1}: {self._get_current_model()}")
 
     async def _make_request_with_retry(self, client, headers, payload, max_retries=3):
         """Make request with exponential backoff retry logic, key rotation, and model fallback"""
@@ -106,7 +109,7 @@ Always encourage interested customers to contact 01678-134547."""
             
             tried_models.add(current_model)
             payload["model"] = current_model
-            print(f"Trying model: {current_model}")
+            logger.debug(f"Trying model: {current_model}")
             
             # Reset key index for each new model
             original_key_index = self.current_key_index
@@ -130,7 +133,7 @@ Always encourage interested customers to contact 01678-134547."""
                             try:
                                 error_data = response.json()
                                 if "rate-limited" in str(error_data).lower():
-                                    print(f"Model {current_model} is rate-limited. Trying next model.")
+                                    logger.warning(f"Model {current_model} is rate-limited. Trying next model.")
                                     self._rotate_model()
                                     break  # Break inner loop to try next model
                             except:
@@ -138,22 +141,22 @@ Always encourage interested customers to contact 01678-134547."""
                             
                             if attempt < max_retries:
                                 wait_time = (2 ** attempt) + (0.1 * attempt)  # Exponential backoff
-                                print(f"Rate limited with key {self.current_key_index + 1} and model {self.current_model_index + 1}. Waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
+                                logger.warning(f"Rate limited with key {self.current_key_index + 1} and model {self.current_model_index + 1}. Waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
                                 await asyncio.sleep(wait_time)
                                 continue
                             else:
                                 # Max retries reached with this key, rotate to next key
-                                print(f"Rate limited with key {self.current_key_index + 1} and model {self.current_model_index + 1}. Rotating to next key.")
+                                logger.warning(f"Rate limited with key {self.current_key_index + 1} and model {self.current_model_index + 1}. Rotating to next key.")
                                 self._rotate_api_key()
                                 break  # Break inner loop to try next key
                         elif response.status_code == 401:
                             # Invalid key, rotate to next key
-                            print(f"Invalid API key {self.current_key_index + 1} with model {self.current_model_index + 1}. Rotating to next key.")
+                            logger.warning(f"Invalid API key {self.current_key_index + 1} with model {self.current_model_index + 1}. Rotating to next key.")
                             self._rotate_api_key()
                             break  # Break inner loop to try next key
                         elif response.status_code == 404:
                             # Model not found, rotate to next model
-                            print(f"Model {current_model} not found. Rotating to next model.")
+                            logger.warning(f"Model {current_model} not found. Rotating to next model.")
                             self._rotate_model()
                             break  # Break inner loop to try next model
                         else:
@@ -163,7 +166,7 @@ Always encourage interested customers to contact 01678-134547."""
                     except httpx.TimeoutException as e:
                         if attempt < max_retries:
                             wait_time = (2 ** attempt)  # Exponential backoff
-                            print(f"Timeout on attempt {attempt + 1} with key {self.current_key_index + 1} and model {self.current_model_index + 1}. Waiting {wait_time}s before retry...")
+                            logger.warning(f"Timeout on attempt {attempt + 1} with key {self.current_key_index + 1} and model {self.current_model_index + 1}. Waiting {wait_time}s before retry...")
                             await asyncio.sleep(wait_time)
                             continue
                         else:
@@ -171,7 +174,7 @@ Always encourage interested customers to contact 01678-134547."""
                     except Exception as e:
                         if attempt < max_retries:
                             wait_time = (2 ** attempt)  # Exponential backoff
-                            print(f"Error on attempt {attempt + 1} with key {self.current_key_index + 1} and model {self.current_model_index + 1}: {e}. Waiting {wait_time}s before retry...")
+                            logger.warning(f"Error on attempt {attempt + 1} with key {self.current_key_index + 1} and model {self.current_model_index + 1}: {e}. Waiting {wait_time}s before retry...")
                             await asyncio.sleep(wait_time)
                             continue
                         else:
@@ -189,11 +192,6 @@ Always encourage interested customers to contact 01678-134547."""
     async def get_response(self, message: str, language: str = "en") -> str:
         """Get AI response from OpenRouter"""
         
-        # Debug print
-        print(f"Getting response for message: {message}")
-        print(f"Using API Key: {self._get_current_api_key()[:10] if self._get_current_api_key() else 'None'}...")
-        print(f"Using Model: {self._get_current_model()}")
-        
         headers = {
             "Content-Type": "application/json"
         }
@@ -212,10 +210,10 @@ Always encourage interested customers to contact 01678-134547."""
             "temperature": 0.7
         }
         
-        # Debug print
-        print(f"Sending request to {self.base_url}")
-        print(f"Headers: {headers}")
-        print(f"Payload: {payload}")
+        logger.debug(
+            "Sending chat completion request",
+            extra={"model": self._get_current_model(), "language": language, "message_length": len(message)}
+        )
         
         async with httpx.AsyncClient() as client:
             try:
@@ -227,36 +225,35 @@ Always encourage interested customers to contact 01678-134547."""
                 if response is None:
                     return "I'm having technical difficulties. Please contact us at 01678-134547."
                 
-                print(f"Response status: {response.status_code}")
-                print(f"Response headers: {response.headers}")
-                print(f"Used model: {used_model}")
+                logger.debug(
+                    "Chat completion response",
+                    extra={"status_code": response.status_code, "model": used_model}
+                )
                 
                 response.raise_for_status()
                 
                 data = response.json()
-                print(f"Response data: {data}")
                 
                 # Extract the AI response
                 ai_response = data["choices"][0]["message"]["content"]
                 
                 # Check if the response is empty and provide a fallback
                 if not ai_response or ai_response.strip() == "":
-                    print("AI returned empty response, providing fallback")
+                    logger.warning("AI returned empty response, providing fallback")
                     return "Hello! I'm your SmartTech assistant. We specialize in Interactive Smart Boards with Android 12, 16GB RAM, 256GB storage, and many advanced features. Our main product is the RK3588 model available in sizes from 65\" to 110\". How can I help you today? You can ask me about our products, pricing, or how to place an order."
                 
                 return ai_response
                 
             except httpx.TimeoutException as e:
-                print(f"Timeout error: {e}")
+                logger.warning(f"Timeout error: {e}")
                 return "I'm sorry, I'm experiencing some delays. Please try again in a moment."
             except httpx.HTTPStatusError as e:
-                print(f"HTTP status error: {e}")
-                print(f"Response text: {e.response.text}")
+                logger.warning(f"HTTP status error from OpenRouter: {e.response.status_code}")
                 if e.response.status_code == 401:
                     return "I'm currently unavailable. Please contact us directly at 01678-134547."
                 elif e.response.status_code == 429:
                     return "I'm experiencing high demand right now. Please wait a moment and try again, or contact us directly at 01678-134547 for immediate assistance."
                 return "I'm having technical difficulties. Please contact us at 01678-134547."
             except Exception as e:
-                print(f"Chatbot error: {e}")
+                logger.exception(f"Chatbot error: {e}")
                 return "I'm having technical difficulties. Please contact us at 01678-134547."
\ No newline at end of file
@@ -1,17 +1,28 @@
 import aiosmtplib
+import asyncio
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
 import os
 from dotenv import load_dotenv
 import logging
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# Compiled templates are cached here across restarts (default: a per-user temp directory)
+EMAIL_TEMPLATE_CACHE_DIR = os.getenv("EMAIL_TEMPLATE_CACHE_DIR")
+# Recompile a template when its file changes on disk
+EMAIL_TEMPLATE_AUTO_RELOAD = os.getenv("EMAIL_TEMPLATE_AUTO_RELOAD", "true").lower() == "true"
+
+STATUS_LABELS = {
+    'confirmed': 'Confirmed',
+    'shipped': 'Shipped',
+    'delivered': 'Delivered',
+    'cancelled': 'Cancelled'
+}
+
 class EmailService:
     def __init__(self):
         self.smtp_host = os.getenv("SMTP_HOST")
@@ -19,11 +30,48 @@ class EmailService:
         self.smtp_email = os.getenv("SMTP_EMAIL")
         self.smtp_password = os.getenv("SMTP_PASSWORD")
         self.recipient_email = os.getenv("RECIPIENT_EMAIL")
+        self.smtp_start_tls = os.getenv("SMTP_START_TLS", "true").lower() == "true"
         
         # Setup Jinja2 for email templates - fix the directory path
         template_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'email')
         logger.info(f"Looking for email templates in: {template_dir}")
-        self.env = Environment(loader=FileSystemLoader(template_dir))
+        if EMAIL_TEMPLATE_CACHE_DIR:
+            os.makedirs(EMAIL_TEMPLATE_CACHE_DIR, exist_ok=True)
+        self.env = Environment(
+            loader=FileSystemLoader(template_dir),
+            bytecode_cache=FileSystemBytecodeCache(EMAIL_TEMPLATE_CACHE_DIR),
+            auto_reload=EMAIL_TEMPLATE_AUTO_RELOAD,
+        )
+        self.precompile_templates()
+    
+    def precompile_templates(self):
+        """Compile every template now so the first email doesn't pay for it"""
+        try:
+            for name in self.env.list_templates(extensions=["html"]):
+                self.env.get_template(name)
+        except Exception as e:
+            logger.warning(f"Failed to precompile email templates: {e}")
+    
+    def render_message(self, template_name: str, to_email: str, subject: str, **context) -> MIMEMultipart:
+        """Render a template into a MIME message. Blocking: run it in a worker thread."""
+        html_content = self.env.get_template(template_name).render(**context)
+        
+        message = MIMEMultipart("alternative")
+        message["Subject"] = subject
+        message["From"] = self.smtp_email
+        message["To"] = to_email
+        message.attach(MIMEText(html_content, "html"))
+        return message
+    
+    def _status_update_messages(self, order_data: dict, customer_data: dict) -> list:
+        """(template, recipient, subject, context) for the admin and customer status update emails"""
+        status_label = STATUS_LABELS.get(order_data['status'], order_data['status'])
+        subject = f"Order #{order_data['id']} Status Updated - {status_label}"
+        context = {"order": order_data, "customer": customer_data, "status_label": status_label}
+        return [
+            ('admin_order_status_update.html', self.recipient_email, subject, context),
+            ('customer_order_status_update.html', customer_data['email'], subject, context),
+        ]
     
     async def send_order_notification(self, order_data: dict, customer_data: dict):
         """Send order notification to admin and customer"""
@@ -54,16 +102,12 @@ class EmailService:
         try:
             subject = f"New Order #{order_data['id']} - SmartTech Interactive Board"
             
-            template = self.env.get_template('admin_order_notification.html')
-            html_content = template.render(
-                order=order_data,
-                customer=customer_data
-            )
-            
-            await self._send_email(
+            await self._send_template(
+                'admin_order_notification.html',
                 to_email=self.recipient_email,
                 subject=subject,
-                html_content=html_content
+                order=order_data,
+                customer=customer_data
             )
         except Exception as e:
             logger.error(f"Failed to send admin notification: {e}")
@@ -72,28 +116,8 @@ class EmailService:
     async def _send_admin_status_update(self, order_data: dict, customer_data: dict):
         """Send order status update to admin"""
         try:
-            status_labels = {
-                'confirmed': 'Confirmed',
-                'shipped': 'Shipped',
-                'delivered': 'Delivered',
-                'cancelled': 'Cancelled'
-            }
-            
-            status_label = status_labels.get(order_data['status'], order_data['status'])
-            subject = f"Order #{order_data['id']} Status Updated - {status_label}"
-            
-            template = self.env.get_template('admin_order_status_update.html')
-            html_content = template.render(
-                order=order_data,
-                customer=customer_data,
-                status_label=status_label
-            )
-            
-            await self._send_email(
-                to_email=self.recipient_email,
-                subject=subject,
-                html_content=html_content
-            )
+            template_name, to_email, subject, context = self._status_update_messages(order_data, customer_data)[0]
+            await self._send_template(template_name, to_email=to_email, subject=subject, **context)
         except Exception as e:
             logger.error(f"Failed to send admin status update: {e}")
             raise e
@@ -103,16 +127,12 @@ class EmailService:
         try:
             subject = f"Order Confirmation #{order_data['id']} - SmartTech"
             
-            template = self.env.get_template('customer_order_confirmation.html')
-            html_content = template.render(
-                order=order_data,
-                customer=customer_data
-            )
-            
-            await self._send_email(
+            await self._send_template(
+                'customer_order_confirmation.html',
                 to_email=customer_data['email'],
                 subject=subject,
-                html_content=html_content
+                order=order_data,
+                customer=customer_data
             )
         except Exception as e:
             logger.error(f"Failed to send customer confirmation: {e}")
@@ -121,52 +141,62 @@ class EmailService:
     async def _send_customer_status_update(self, order_data: dict, customer_data: dict):
         """Send order status update to customer"""
         try:
-            status_labels = {
-                'confirmed': 'Confirmed',
-                'shipped': 'Shipped',
-                'delivered': 'Delivered',
-                'cancelled': 'Cancelled'
-            }
-            
-            status_label = status_labels.get(order_data['status'], order_data['status'])
-            subject = f"Order #{order_data['id']} Status Updated - {status_label}"
-            
-            template = self.env.get_template('customer_order_status_update.html')
-            html_content = template.render(
-                order=order_data,
-                customer=customer_data,
-                status_label=status_label
-            )
-            
-            await self._send_email(
-                to_email=customer_data['email'],
-                subject=subject,
-                html_content=html_content
-            )
+            template_name, to_email, subject, context = self._status_update_messages(order_data, customer_data)[1]
+            await self._send_template(template_name, to_email=to_email, subject=subject, **context)
         except Exception as e:
             logger.error(f"Failed to send customer status update: {e}")
             raise e
     
-    async def _send_email(self, to_email: str, subject: str, html_content: str):
+    async def send_order_status_updates(self, updates: list) -> int:
+        """Send status update emails for many (order_data, customer_data) pairs over one SMTP connection.
+        
+        Failures are logged per message; returns the number of emails sent.
+        """
+        specs = [spec for order_data, customer_data in updates for spec in self._status_update_messages(order_data, customer_data)]
+        if not specs:
+            return 0
+        
+        def render_all():
+            return [
+                self.render_message(template_name, to_email, subject, **context)
+                for template_name, to_email, subject, context in specs
+            ]
+        
+        messages = await asyncio.to_thread(render_all)
+        sent = 0
+        async with aiosmtplib.SMTP(
+            hostname=self.smtp_host,
+            port=self.smtp_port,
+            start_tls=self.smtp_start_tls,
+            username=self.smtp_email,
+            password=self.smtp_password,
+        ) as smtp:
+            for message in messages:
+                try:
+                    await smtp.send_message(message)
+                    sent += 1
+                except aiosmtplib.SMTPException as e:
+                    logger.error(f"Email sending failed to {message['To']}: {e}")
+        logger.info(f"Sent {sent} of {len(messages)} status update emails")
+        return sent
+    
+    async def _send_template(self, template_name: str, to_email: str, subject: str, **context):
+        """Render off the event loop, then send"""
+        message = await asyncio.to_thread(self.render_message, template_name, to_email, subject, **context)
+        await self._send_email(message)
+    
+    async def _send_email(self, message: MIMEMultipart):
         """Send email using SMTP"""
         try:
-            message = MIMEMultipart("alternative")
-            message["Subject"] = subject
-            message["From"] = self.smtp_email
-            message["To"] = to_email
-            
-            html_part = MIMEText(html_content, "html")
-            message.attach(html_part)
-            
             await aiosmtplib.send(
                 message,
                 hostname=self.smtp_host,
                 port=self.smtp_port,
-                start_tls=True,
+                start_tls=self.smtp_start_tls,
                 username=self.smtp_email,
                 password=self.smtp_password,
             )
-            logger.info(f"Email sent successfully to {to_email}")
+            logger.info(f"Email sent successfully to {message['To']}")
         except Exception as e:
             logger.error(f"Email sending failed: {e}")
             raise e
\ No newline at end of file
@@ -0,0 +1,182 @@
+"""
+Mark-and-sweep garbage collection for uploaded media.
+
+Mark: every indexed media file linked to a product in product_media.
+Sweep: unreferenced files older than the grace period are moved to the
+quarantine directory; files without a media_assets row are left alone
+until reconcile has indexed them. Files that stay in quarantine for
+another grace period are deleted. A quarantined file that is referenced
+again is restored. Abandoned resumable uploads are cleaned up too.
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy import Text, cast, or_
+from pathlib import Path
+import os
+import shutil
+import time
+from dotenv import load_dotenv
+import logging
+
+from database import SessionLocal
+from models import MediaAsset, Product, ProductMedia
+from services.media_library import MEDIA_TYPES, media_service, parse_media_url, product_media_urls, reconcile
+from services.media_service import STAGING_ROOT
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+QUARANTINE_ROOT = Path(os.getenv("MEDIA_QUARANTINE_DIR", ".quarantine"))
+GRACE_PERIOD_HOURS = float(os.getenv("MEDIA_GC_GRACE_HOURS", 24))
+
+
+def referenced_media(db: Session) -> set:
+    """(file_type, filename) of every indexed media file linked to a product"""
+    rows = db.query(MediaAsset.file_type, MediaAsset.filename).join(
+        ProductMedia, ProductMedia.media_id == MediaAsset.id
+    ).distinct()
+    return {(row.file_type, row.filename) for row in rows}
+
+
+def indexed_media(db: Session) -> set:
+    """(file_type, filename) of every file in media_assets"""
+    return {(row.file_type, row.filename) for row in db.query(MediaAsset.file_type, MediaAsset.filename)}
+
+
+def referencing_product_ids(db: Session, file_type: str, filename: str) -> list:
+    """Ids of products linked to the given file"""
+    rows = db.query(ProductMedia.product_id).join(
+        MediaAsset, MediaAsset.id == ProductMedia.media_id
+    ).filter(
+        MediaAsset.file_type == file_type,
+        MediaAsset.filename == filename
+    ).order_by(ProductMedia.product_id)
+    return [row.product_id for row in rows]
+
+
+def _referenced_again(db: Session, file_type: str, filename: str) -> bool:
+    """Whether a product points at a quarantined file.
+
+    Quarantined files have no media_assets row and so no links; look for
+    their URL in the products table instead, confirming candidate rows only.
+    """
+    candidates = db.query(Product).filter(or_(
+        cast(Product.images, Text).contains(filename, autoescape=True),
+        Product.video_url.contains(filename, autoescape=True)
+    ))
+    return any(
+        (file_type, filename) in {parse_media_url(url) for url in product_media_urls(product)}
+        for product in candidates
+    )
+
+
+def _media_files(directory: Path):
+    if not directory.exists():
+        return []
+    return [
+        path for path in directory.iterdir()
+        if path.is_file() and not path.name.startswith(".") and not path.name.endswith((".gz", ".br"))
+    ]
+
+
+def collect_garbage(dry_run: bool = False, grace_period_hours: float = None, db: Session = None) -> dict:
+    """Quarantine unreferenced media and delete expired quarantine. Blocking."""
+    grace_seconds = (GRACE_PERIOD_HOURS if grace_period_hours is None else grace_period_hours) * 3600
+    cutoff = time.time() - grace_seconds
+    own_session = db is None
+    if own_session:
+        db = SessionLocal()
+
+    report = {
+        "dry_run": dry_run,
+        "referenced": 0,
+        "quarantined": [],
+        "restored": [],
+        "deleted": [],
+        "quarantined_bytes": 0,
+        "reclaimed_bytes": 0,
+    }
+    try:
+        referenced = referenced_media(db)
+        indexed = indexed_media(db)
+        report["referenced"] = len(referenced)
+
+        for file_type in MEDIA_TYPES:
+            media_dir = media_service.upload_dir(file_type)
+            quarantine_dir = QUARANTINE_ROOT / file_type
+
+            # Sweep live media into quarantine
+            quarantined_now = set()
+            for path in _media_files(media_dir):
+                stat_result = path.stat()
+                key = (file_type, path.name)
+                if key in referenced or key not in indexed or stat_result.st_mtime > cutoff:
+                    continue
+                report["quarantined"].append(f"{file_type}/{path.name}")
+                report["quarantined_bytes"] += stat_result.st_size
+                quarantined_now.add(path.name)
+                if dry_run:
+                    continue
+                quarantine_dir.mkdir(parents=True, exist_ok=True)
+                target = quarantine_dir / path.name
+                try:
+                    os.replace(path, target)
+                except FileNotFoundError:
+                    continue  # Collected concurrently by another worker
+                # Quarantine age is measured from now
+                os.utime(target)
+                for suffix in (".gz", ".br"):
+                    path.with_name(path.name + suffix).unlink(missing_ok=True)
+                db.query(MediaAsset).filter(
+                    MediaAsset.file_type == file_type,
+                    MediaAsset.filename == path.name
+                ).delete()
+
+            # Restore files referenced again, delete expired ones
+            for path in _media_files(quarantine_dir):
+                stat_result = path.stat()
+                if _referenced_again(db, file_type, path.name):
+                    report["restored"].append(f"{file_type}/{path.name}")
+                    if not dry_run:
+                        media_dir.mkdir(parents=True, exist_ok=True)
+                        os.replace(path, media_dir / path.name)
+                elif stat_result.st_mtime <= cutoff and path.name not in quarantined_now:
+                    report["deleted"].append(f"{file_type}/{path.name}")
+                    report["reclaimed_bytes"] += stat_result.st_size
+                    if not dry_run:
+                        path.unlink(missing_ok=True)
+
+        # Resumable uploads nobody finished
+        if STAGING_ROOT.exists():
+            for path in STAGING_ROOT.iterdir():
+                if not path.is_dir():
+                    continue
+                files = [f.stat() for f in path.rglob("*") if f.is_file()]
+                if max((f.st_mtime for f in files), default=0) > cutoff:
+                    continue
+                size = sum(f.st_size for f in files)
+                report["deleted"].append(f"uploads/{path.name}")
+                report["reclaimed_bytes"] += size
+                if not dry_run:
+                    shutil.rmtree(path, ignore_errors=True)
+
+        if dry_run:
+            db.rollback()
+        else:
+            db.commit()
+            if report["restored"]:
+                reconcile(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if own_session:
+            db.close()
+
+    logger.info(
+        f"Media GC{' (dry run)' if dry_run else ''}: quarantined {len(report['quarantined'])} files, "
+        f"restored {len(report['restored'])}, deleted {len(report['deleted'])}, "
+        f"reclaimed {report['reclaimed_bytes']} bytes"
+    )
+    return report
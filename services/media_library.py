@@ -0,0 +1,141 @@
+"""
+Media library bookkeeping: the media_assets table and its links to products.
+
+Uploads and deletes keep the table current as they happen. `reconcile`
+catches files that were added to or removed from disk out-of-band.
+"""
+
+from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+import hashlib
+import re
+import logging
+
+from database import SessionLocal
+from models import MediaAsset, ProductMedia, Product
+from services.asset_manifest import static_manifest
+from services.media_service import MediaService
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPES = ["images", "videos"]
+MEDIA_URL_PATTERN = re.compile(r"^/(?:static|media)/(images|videos)/([^/?#]+)$")
+
+media_service = MediaService()
+
+
+def parse_media_url(url: str):
+    """Split a local media URL into (file_type, filename), or None for other URLs"""
+    if not url:
+        return None
+    match = MEDIA_URL_PATTERN.match(static_manifest.original_url(url))
+    return (match.group(1), match.group(2)) if match else None
+
+
+def product_media_urls(product) -> list:
+    """All media URLs a product refers to"""
+    urls = list(product.images or [])
+    if product.video_url:
+        urls.append(product.video_url)
+    return urls
+
+
+def sync_product_media(db: Session, product):
+    """Point the product's media links at the assets its images and video_url reference"""
+    sync_products_media(db, [product])
+
+
+def sync_products_media(db: Session, products):
+    """sync_product_media for many products, with one query for the assets and one for the links"""
+    keys_by_product = {
+        product.id: {key for key in map(parse_media_url, product_media_urls(product)) if key}
+        for product in products
+    }
+    if not keys_by_product:
+        return
+    filenames = {filename for keys in keys_by_product.values() for _, filename in keys}
+    assets = {}
+    if filenames:
+        rows = db.query(MediaAsset.id, MediaAsset.file_type, MediaAsset.filename).filter(MediaAsset.filename.in_(filenames))
+        assets = {(row.file_type, row.filename): row.id for row in rows}
+
+    links = {}
+    for link in db.query(ProductMedia).filter(ProductMedia.product_id.in_(keys_by_product)):
+        links.setdefault(link.product_id, {})[link.media_id] = link
+
+    for product_id, keys in keys_by_product.items():
+        media_ids = {assets[key] for key in keys if key in assets}
+        existing = links.get(product_id, {})
+        for media_id, link in existing.items():
+            if media_id not in media_ids:
+                db.delete(link)
+        for media_id in media_ids - existing.keys():
+            db.add(ProductMedia(product_id=product_id, media_id=media_id))
+
+
+def _hash_file(path) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def reconcile(db: Session = None) -> dict:
+    """Bring media_assets in line with the files on disk. Blocking.
+
+    Files without a row are hashed, probed and recorded; rows whose file is
+    gone are removed. Product links are then rebuilt for every product.
+    """
+    own_session = db is None
+    if own_session:
+        db = SessionLocal()
+    report = {"added": 0, "removed": 0, "skipped": 0}
+    try:
+        for file_type in MEDIA_TYPES:
+            directory = media_service.upload_dir(file_type)
+            on_disk = {}
+            if directory.exists():
+                on_disk = {
+                    path.name: path for path in directory.iterdir()
+                    if path.is_file() and not path.name.startswith(".") and not path.name.endswith((".gz", ".br"))
+                }
+
+            known = {asset.filename: asset for asset in db.query(MediaAsset).filter(MediaAsset.file_type == file_type)}
+            for filename, asset in known.items():
+                if filename not in on_disk:
+                    db.delete(asset)
+                    report["removed"] += 1
+
+            for filename, path in on_disk.items():
+                if filename in known:
+                    continue
+                sha256 = _hash_file(path)
+                if db.query(MediaAsset.id).filter(MediaAsset.sha256 == sha256).first():
+                    logger.warning(f"Skipping {file_type}/{filename}: identical content is already recorded")
+                    report["skipped"] += 1
+                    continue
+                stat_result = path.stat()
+                db.add(MediaAsset(
+                    sha256=sha256,
+                    file_type=file_type,
+                    filename=filename,
+                    original_filename=filename,
+                    size=stat_result.st_size,
+                    created_at=datetime.fromtimestamp(stat_result.st_mtime, tz=timezone.utc),
+                    **media_service.probe_media(path, file_type)
+                ))
+                db.flush()
+                report["added"] += 1
+
+        sync_products_media(db, db.query(Product).all())
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if own_session:
+            db.close()
+
+    logger.info(f"Media library reconciled: {report}")
+    return report
@@ -0,0 +1,372 @@
+import aiofiles
+import aiofiles.os
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import struct
+import time
+import uuid
+from pathlib import Path
+from PIL import Image
+from dotenv import load_dotenv
+import logging
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+MEDIA_ROOT = Path(os.getenv("MEDIA_ROOT", "static"))
+# Partial resumable uploads; kept outside MEDIA_ROOT so they are never served
+STAGING_ROOT = Path(os.getenv("UPLOAD_STAGING_DIR", ".uploads"))
+
+# Content-addressed files are named <sha256><ext>
+CONTENT_HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+def is_content_addressed(filename: str) -> bool:
+    """Whether a filename is derived from its content hash (and so never changes)"""
+    return bool(CONTENT_HASH_PATTERN.match(Path(filename).stem))
+
+
+def _iter_mp4_boxes(f, start: int, end: int):
+    """Yield (type, payload_start, payload_end) for the MP4 boxes in [start, end)"""
+    position = start
+    while position + 8 <= end:
+        f.seek(position)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack(">I4s", header)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            size = end - position
+        if size < header_size:
+            return
+        yield box_type, position + header_size, min(position + size, end)
+        position += size
+
+
+def read_mp4_metadata(path) -> dict:
+    """Read duration and frame size from the moov box of an MP4/MOV file"""
+    metadata = {"width": None, "height": None, "duration": None}
+    with open(path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        for box_type, start, end in _iter_mp4_boxes(f, 0, file_size):
+            if box_type != b"moov":
+                continue
+            for child_type, child_start, child_end in _iter_mp4_boxes(f, start, end):
+                if child_type == b"mvhd":
+                    f.seek(child_start)
+                    version = f.read(4)[0]
+                    if version == 1:
+                        timescale, duration = struct.unpack(">16xIQ", f.read(28))
+                    else:
+                        timescale, duration = struct.unpack(">8xII", f.read(16))
+                    if timescale:
+                        metadata["duration"] = round(duration / timescale, 3)
+                elif child_type == b"trak" and metadata["width"] is None:
+                    for track_type, track_start, track_end in _iter_mp4_boxes(f, child_start, child_end):
+                        if track_type != b"tkhd":
+                            continue
+                        # Width and height are the last 8 bytes, as 16.16 fixed point
+                        f.seek(track_end - 8)
+                        width, height = struct.unpack(">II", f.read(8))
+                        if width and height:
+                            metadata["width"], metadata["height"] = width >> 16, height >> 16
+            break
+    return metadata
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size limit"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        super().__init__(f"File exceeds the maximum size of {max_bytes // (1024 * 1024)}MB")
+
+
+class UploadNotFoundError(Exception):
+    """Raised when a resumable upload does not exist"""
+
+
+class UploadIncompleteError(Exception):
+    """Raised when a resumable upload is finalized before all bytes arrived"""
+
+
+class InvalidChunkError(Exception):
+    """Raised when a chunk falls outside the declared upload size"""
+
+
+class MediaService:
+    def __init__(self):
+        self.chunk_size = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))
+        self.max_sizes = {
+            "images": int(os.getenv("MAX_IMAGE_UPLOAD_MB", 10)) * 1024 * 1024,
+            "videos": int(os.getenv("MAX_VIDEO_UPLOAD_MB", 500)) * 1024 * 1024,
+        }
+        # Running hash over the contiguous prefix of each resumable upload,
+        # so finalizing only has to read back bytes that arrived out of order
+        self._prefix_hashes = {}
+
+    def upload_dir(self, file_type: str) -> Path:
+        """Directory holding media of the given type"""
+        return MEDIA_ROOT / file_type
+
+    def media_url(self, file_type: str, filename: str) -> str:
+        """Public URL of a stored media file"""
+        return f"/static/{file_type}/{filename}"
+
+    def probe_media(self, path, file_type: str) -> dict:
+        """Read dimensions (and duration for videos) of a media file. Blocking."""
+        try:
+            if file_type == "images":
+                with Image.open(path) as image:
+                    width, height = image.size
+                return {"width": width, "height": height, "duration": None}
+            return read_mp4_metadata(path)
+        except Exception as e:
+            logger.warning(f"Could not read media metadata from {path}: {e}")
+            return {"width": None, "height": None, "duration": None}
+
+    def exists(self, file_type: str, filename: str) -> bool:
+        """Check whether a stored media file is present on disk"""
+        return (self.upload_dir(file_type) / filename).is_file()
+
+    async def stage_upload(self, upload, file_type: str) -> dict:
+        """Stream an upload to a temporary file in chunks, hashing it on the way.
+
+        The temporary file lives in the destination directory so that
+        `commit_upload` can atomically rename it into place.
+        """
+        upload_dir = self.upload_dir(file_type)
+        await aiofiles.os.makedirs(upload_dir, exist_ok=True)
+
+        max_bytes = self.max_sizes[file_type]
+        temp_path = upload_dir / f".{uuid.uuid4()}.part"
+
+        sha256 = hashlib.sha256()
+        size = 0
+        try:
+            async with aiofiles.open(temp_path, "wb") as buffer:
+                while True:
+                    chunk = await upload.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise UploadTooLargeError(max_bytes)
+                    sha256.update(chunk)
+                    await buffer.write(chunk)
+        except BaseException:
+            await self.discard_upload({"temp_path": temp_path})
+            raise
+
+        return {
+            "temp_path": temp_path,
+            "file_type": file_type,
+            "extension": Path(upload.filename or "").suffix.lower(),
+            "size": size,
+            "sha256": sha256.hexdigest(),
+        }
+
+    async def commit_upload(self, staged: dict) -> str:
+        """Move a staged upload to its content-addressed name and return the filename"""
+        filename = f"{staged['sha256']}{staged['extension']}"
+        file_path = self.upload_dir(staged["file_type"]) / filename
+
+        if await aiofiles.os.path.exists(file_path):
+            # Identical bytes are already stored under this name
+            await self.discard_upload(staged)
+        else:
+            await aiofiles.os.makedirs(file_path.parent, exist_ok=True)
+            await aiofiles.os.replace(staged["temp_path"], file_path)
+            if staged.get("staging_dir"):
+                await asyncio.to_thread(shutil.rmtree, staged["staging_dir"], True)
+            logger.info(f"Stored upload {filename} ({staged['size']} bytes)")
+        return filename
+
+    async def discard_upload(self, staged: dict):
+        """Remove a staged upload that is not going to be kept"""
+        if await aiofiles.os.path.exists(staged["temp_path"]):
+            await aiofiles.os.remove(staged["temp_path"])
+        if staged.get("staging_dir"):
+            await asyncio.to_thread(shutil.rmtree, staged["staging_dir"], True)
+
+    # Resumable uploads
+    #
+    # Each upload gets a directory under STAGING_ROOT holding the metadata,
+    # a data file preallocated to the final size and one marker file per
+    # received chunk. Chunks are written in place at their offset, so they
+    # may arrive in any order and in parallel, and finalizing is a rename.
+
+    def _upload_path(self, upload_id: str) -> Path:
+        try:
+            upload_id = uuid.UUID(upload_id).hex
+        except ValueError:
+            raise UploadNotFoundError(upload_id)
+        path = STAGING_ROOT / upload_id
+        if not path.is_dir():
+            raise UploadNotFoundError(upload_id)
+        return path
+
+    def _read_meta(self, path: Path) -> dict:
+        with open(path / "meta.json") as f:
+            return json.load(f)
+
+    def _received_ranges(self, path: Path) -> list:
+        """Merge the chunk markers of an upload into sorted [start, end) ranges"""
+        ranges = []
+        for marker in sorted(os.listdir(path / "chunks")):
+            start, end = (int(part) for part in marker.split("-"))
+            if ranges and start <= ranges[-1][1]:
+                ranges[-1][1] = max(ranges[-1][1], end)
+            else:
+                ranges.append([start, end])
+        return ranges
+
+    def _status(self, upload_id: str, path: Path, meta: dict) -> dict:
+        ranges = self._received_ranges(path)
+        received = sum(end - start for start, end in ranges)
+        return {
+            "upload_id": upload_id,
+            "file_type": meta["file_type"],
+            "filename": meta["filename"],
+            "total_size": meta["total_size"],
+            "received_bytes": received,
+            "received_ranges": ranges,
+            "complete": received == meta["total_size"],
+            "chunk_size": self.chunk_size,
+        }
+
+    async def create_resumable_upload(self, file_type: str, filename: str, total_size: int, content_type: str = None) -> dict:
+        """Start a resumable upload and preallocate its data file"""
+        max_bytes = self.max_sizes[file_type]
+        if total_size > max_bytes:
+            raise UploadTooLargeError(max_bytes)
+
+        upload_id = uuid.uuid4().hex
+        path = STAGING_ROOT / upload_id
+        meta = {
+            "file_type": file_type,
+            "filename": filename,
+            "content_type": content_type,
+            "total_size": total_size,
+            "created_at": time.time(),
+        }
+
+        def _create():
+            (path / "chunks").mkdir(parents=True)
+            with open(path / "data", "wb") as f:
+                f.truncate(total_size)
+            with open(path / "meta.json", "w") as f:
+                json.dump(meta, f)
+
+        await asyncio.to_thread(_create)
+        self._prefix_hashes[upload_id] = {"hash": hashlib.sha256(), "offset": 0, "busy": False}
+        return self._status(upload_id, path, meta)
+
+    async def get_resumable_upload(self, upload_id: str) -> dict:
+        """Report which byte ranges of a resumable upload have been received"""
+        path = self._upload_path(upload_id)
+        meta = await asyncio.to_thread(self._read_meta, path)
+        return await asyncio.to_thread(self._status, path.name, path, meta)
+
+    async def write_chunk(self, upload_id: str, offset: int, stream) -> dict:
+        """Write a chunk streamed from `stream` at `offset` of a resumable upload"""
+        path = self._upload_path(upload_id)
+        upload_id = path.name
+        meta = await asyncio.to_thread(self._read_meta, path)
+        total_size = meta["total_size"]
+        if offset < 0 or offset >= total_size:
+            raise InvalidChunkError(f"Offset {offset} is outside the upload (0-{total_size - 1})")
+
+        # Extend the running hash when this chunk continues the hashed prefix
+        prefix = self._prefix_hashes.get(upload_id)
+        feed_hash = prefix is not None and prefix["offset"] == offset and not prefix["busy"]
+        if feed_hash:
+            prefix["busy"] = True
+
+        written = 0
+        buffer = bytearray()
+        completed = False
+        try:
+            async with aiofiles.open(path / "data", "r+b") as f:
+                await f.seek(offset)
+                async for piece in stream:
+                    if offset + written + len(buffer) + len(piece) > total_size:
+                        raise InvalidChunkError("Chunk extends past the declared upload size")
+                    buffer += piece
+                    if len(buffer) >= self.chunk_size:
+                        await f.write(buffer)
+                        if feed_hash:
+                            prefix["hash"].update(buffer)
+                        written += len(buffer)
+                        buffer = bytearray()
+                if buffer:
+                    await f.write(buffer)
+                    if feed_hash:
+                        prefix["hash"].update(buffer)
+                    written += len(buffer)
+            completed = True
+        finally:
+            if feed_hash:
+                if completed:
+                    prefix["offset"] += written
+                    prefix["busy"] = False
+                else:
+                    # The hash now covers bytes that were never recorded
+                    self._prefix_hashes.pop(upload_id, None)
+
+        if written:
+            marker = path / "chunks" / f"{offset:020d}-{offset + written:020d}"
+            await asyncio.to_thread(marker.touch)
+        return await asyncio.to_thread(self._status, upload_id, path, meta)
+
+    async def finalize_resumable_upload(self, upload_id: str) -> dict:
+        """Verify a resumable upload is complete and stage it for `commit_upload`"""
+        path = self._upload_path(upload_id)
+        upload_id = path.name
+        meta = await asyncio.to_thread(self._read_meta, path)
+        status = await asyncio.to_thread(self._status, upload_id, path, meta)
+        if not status["complete"]:
+            raise UploadIncompleteError(
+                f"Received {status['received_bytes']} of {meta['total_size']} bytes"
+            )
+
+        prefix = self._prefix_hashes.pop(upload_id, None)
+
+        def _hash():
+            # Only read back what the running hash has not already seen
+            if prefix is not None and not prefix["busy"]:
+                sha256, start = prefix["hash"].copy(), prefix["offset"]
+            else:
+                sha256, start = hashlib.sha256(), 0
+            with open(path / "data", "rb") as f:
+                f.seek(start)
+                while chunk := f.read(self.chunk_size):
+                    sha256.update(chunk)
+            return sha256.hexdigest()
+
+        sha256 = await asyncio.to_thread(_hash)
+        return {
+            "temp_path": path / "data",
+            "staging_dir": path,
+            "file_type": meta["file_type"],
+            "extension": Path(meta["filename"]).suffix.lower(),
+            "original_filename": meta["filename"],
+            "content_type": meta["content_type"],
+            "size": meta["total_size"],
+            "sha256": sha256,
+        }
+
+    async def abort_resumable_upload(self, upload_id: str):
+        """Discard a resumable upload and everything received so far"""
+        path = self._upload_path(upload_id)
+        self._prefix_hashes.pop(path.name, None)
+        await asyncio.to_thread(shutil.rmtree, path, True)
@@ -0,0 +1,131 @@
+"""
+Full-text search over products, customers, orders and chat messages.
+
+PostgreSQL: a generated tsvector column per table with a GIN index.
+SQLite: FTS5 external-content tables kept current by triggers.
+Any other database (or SQLite without FTS5) falls back to LIKE.
+
+Both indexes are updated by the database on every insert, update and
+delete, so they never need a rebuild once created.
+"""
+
+from sqlalchemy import and_, func, literal, literal_column, or_, select, table, text
+from sqlalchemy.engine import Engine
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# No stemming: the catalog and chats mix English and Bangla
+SEARCH_CONFIG = "simple"
+MAX_SEARCH_TERMS = 8
+
+# Searchable text per table
+SEARCH_SOURCES = {
+    "products": ["name", "description"],
+    "customers": ["full_name", "email", "phone"],
+    "orders": ["special_requirements", "delivery_address"],
+    "chat_messages": ["message", "response"],
+}
+
+# Characters with a meaning in tsquery or FTS5 query syntax
+_QUERY_SYNTAX = re.compile(r"[\s\"'*:&|!()<>\\^+-]+")
+
+_backend = None
+
+
+def search_terms(query: str) -> list:
+    """Split a user query into plain terms, dropping query syntax characters"""
+    return [term for term in _QUERY_SYNTAX.split(query.lower()) if term][:MAX_SEARCH_TERMS]
+
+
+def _fts5_available(conn) -> bool:
+    return bool(conn.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar())
+
+
+def _ensure_postgresql(conn):
+    for table_name, columns in SEARCH_SOURCES.items():
+        document = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+        conn.exec_driver_sql(
+            f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('{SEARCH_CONFIG}', {document})) STORED"
+        )
+        conn.exec_driver_sql(
+            f"CREATE INDEX IF NOT EXISTS ix_{table_name}_search_vector ON {table_name} USING GIN (search_vector)"
+        )
+
+
+def _ensure_sqlite(conn):
+    existing = {row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")}
+    for table_name, columns in SEARCH_SOURCES.items():
+        fts = f"{table_name}_fts"
+        column_list = ", ".join(columns)
+        new_values = ", ".join(f"new.{column}" for column in columns)
+        old_values = ", ".join(f"old.{column}" for column in columns)
+        statements = {
+            fts: f"CREATE VIRTUAL TABLE {fts} USING fts5({column_list}, content='{table_name}', content_rowid='id', "
+                 f"tokenize='unicode61 remove_diacritics 2')",
+            f"{fts}_ai": f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table_name} BEGIN "
+                         f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+            f"{fts}_ad": f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table_name} BEGIN "
+                         f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END",
+            f"{fts}_au": f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {column_list} ON {table_name} BEGIN "
+                         f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+                         f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+        }
+        missing = [name for name in statements if name not in existing]
+        for name in missing:
+            conn.exec_driver_sql(statements[name])
+        if missing:
+            # Rows written while the index or a trigger was missing (or the table was recreated)
+            conn.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+            logger.info(f"Built full-text index {fts}")
+
+
+def ensure_search_indexes(engine: Engine) -> str:
+    """Create the search columns, tables, triggers and indexes that are missing. Idempotent."""
+    global _backend
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            _ensure_postgresql(conn)
+            _backend = "postgresql"
+        elif engine.dialect.name == "sqlite" and _fts5_available(conn):
+            _ensure_sqlite(conn)
+            _backend = "fts5"
+        else:
+            _backend = "like"
+    logger.info(f"Full-text search backend: {_backend}")
+    return _backend
+
+
+def search_backend(engine: Engine) -> str:
+    return _backend or ensure_search_indexes(engine)
+
+
+def matches(backend: str, table_name: str, terms: list, name: str = None):
+    """Subquery of (id, score) for the rows of `table_name` matching every term; higher scores rank first
+
+    `name` (default `<table_name>_matches`) must be unique within a statement.
+    """
+    source = table(table_name, *[literal_column(column) for column in ["id"] + SEARCH_SOURCES[table_name]])
+    name = name or f"{table_name}_matches"
+
+    if backend == "postgresql":
+        vector = literal_column(f"{table_name}.search_vector")
+        query = func.to_tsquery(SEARCH_CONFIG, " & ".join(f"{term}:*" for term in terms))
+        return select(
+            source.c.id.label("id"), func.ts_rank(vector, query).label("score")
+        ).select_from(source).where(vector.op("@@")(query)).subquery(name)
+
+    if backend == "fts5":
+        fts = f"{table_name}_fts"
+        return select(
+            literal_column(f"{fts}.rowid").label("id"), (-literal_column(f"{fts}.rank")).label("score")
+        ).select_from(table(fts)).where(
+            text(f"{fts} MATCH :{name}_query").bindparams(**{f"{name}_query": " ".join(f'"{term}"*' for term in terms)})
+        ).subquery(name)
+
+    columns = [source.c[column] for column in SEARCH_SOURCES[table_name]]
+    return select(source.c.id.label("id"), literal(0.0).label("score")).select_from(source).where(
+        and_(*[or_(*[func.lower(column).contains(term, autoescape=True) for column in columns]) for term in terms])
+    ).subquery(name)
@@ -3,20 +3,36 @@ import os
 from dotenv import load_dotenv
 import logging
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# Longest text a single sendMessage accepts
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
+STATUS_EMOJIS = {
+    'confirmed': '✅',
+    'shipped': '🚚',
+    'delivered': '📦',
+    'cancelled': '❌'
+}
+
+STATUS_LABELS = {
+    'confirmed': 'Confirmed',
+    'shipped': 'Shipped',
+    'delivered': 'Delivered',
+    'cancelled': 'Cancelled'
+}
+
 class TelegramService:
     def __init__(self):
         self.bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
         self.chat_id = os.getenv("TELEGRAM_CHAT_ID")
-        self.base_url = f"https://api.telegram.org/bot{self.bot_token}"
+        api_base = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org").rstrip("/")
+        self.base_url = f"{api_base}/bot{self.bot_token}"
         
         # Log initialization
-        logger.info(f"TelegramService initialized with bot token: {self.bot_token[:10]}... and chat_id: {self.chat_id}")
+        logger.info(f"TelegramService initialized (bot token {'set' if self.bot_token else 'missing'}, chat_id: {self.chat_id})")
     
     async def send_order_notification(self, order_data: dict, customer_data: dict):
         """Send order notification to Telegram"""
@@ -58,6 +74,45 @@ class TelegramService:
             logger.error(f"Telegram status update failed: {e}")
             raise e
     
+    async def send_bulk_status_update(self, updates: list):
+        """Send one summary message for many (order_data, customer_data) status updates"""
+        try:
+            messages = self._format_bulk_status_update_messages(updates)
+            
+            async with httpx.AsyncClient() as client:
+                for message in messages:
+                    response = await client.post(
+                        f"{self.base_url}/sendMessage",
+                        json={
+                            "chat_id": self.chat_id,
+                            "text": message,
+                            "parse_mode": "HTML"
+                        }
+                    )
+                    response.raise_for_status()
+            logger.info(f"Telegram bulk status update sent for {len(updates)} orders")
+        except Exception as e:
+            logger.error(f"Telegram bulk status update failed: {e}")
+            raise e
+    
+    def _format_bulk_status_update_messages(self, updates: list, max_length: int = TELEGRAM_MAX_MESSAGE_LENGTH) -> list:
+        """Format a bulk status update as a list of orders, split to fit Telegram's message limit"""
+        status = updates[0][0]['status'] if updates else ''
+        emoji = STATUS_EMOJIS.get(status, 'ℹ️')
+        status_label = STATUS_LABELS.get(status, status)
+        header = f"{emoji} <b>{len(updates)} Orders {status_label}</b>\n"
+        
+        messages = []
+        current = header
+        for order_data, customer_data in updates:
+            line = f"\n• #{order_data['id']} {customer_data['full_name']} - {order_data['product_name']} x{order_data['quantity']} (${order_data['total_price']:.2f})"
+            if len(current) + len(line) > max_length:
+                messages.append(current)
+                current = header
+            current += line
+        messages.append(current)
+        return messages
+    
     def _format_order_message(self, order_data: dict, customer_data: dict) -> str:
         """Format order data for Telegram message"""
         return f"""
@@ -88,22 +143,8 @@ class TelegramService:
     
     def _format_status_update_message(self, order_data: dict, customer_data: dict) -> str:
         """Format order status update for Telegram message"""
-        status_emojis = {
-            'confirmed': '✅',
-            'shipped': '🚚',
-            'delivered': '📦',
-            'cancelled': '❌'
-        }
-        
-        status_labels = {
-            'confirmed': 'Confirmed',
-            'shipped': 'Shipped',
-            'delivered': 'Delivered',
-            'cancelled': 'Cancelled'
-        }
-        
-        emoji = status_emojis.get(order_data['status'], 'ℹ️')
-        status_label = status_labels.get(order_data['status'], order_data['status'])
+        emoji = STATUS_EMOJIS.get(order_data['status'], 'ℹ️')
+        status_label = STATUS_LABELS.get(order_data['status'], order_data['status'])
         
         return f"""
 {emoji} <b>Order Status Updated!</b>
@@ -3,8 +3,11 @@
 # Exit on any error
 set -e
 
-# Run database migrations if needed (optional)
-# alembic upgrade head
+# Bring databases created by earlier versions up to date
+alembic upgrade head
+
+# Render's proxy appends the client address to X-Forwarded-For
+export TRUSTED_PROXY_HOPS="${TRUSTED_PROXY_HOPS:-1}"
 
 # Start the FastAPI application
 python -m uvicorn main:app --host 0.0.0.0 --port $PORT
\ No newline at end of file
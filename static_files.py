@@ -0,0 +1,279 @@
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from email.utils import formatdate
+from pathlib import Path
+import asyncio
+import hashlib
+import mimetypes
+import os
+import uuid
+
+from services.media_service import is_content_addressed
+from services.asset_manifest import static_manifest, is_compressible, PRECOMPRESSED_ENCODINGS
+
+# Content-addressed files never change, so caches may keep them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MEDIA_CACHE_CONTROL = f"public, max-age={int(os.getenv('MEDIA_CACHE_MAX_AGE', 86400))}"
+
+# Requests asking for more ranges than this get the whole file instead
+MAX_RANGES = 16
+
+
+def parse_accept_encoding(accept_encoding: str) -> dict:
+    """Parse an Accept-Encoding header into {coding: q}, dropping refused codings"""
+    codings = {}
+    for item in (accept_encoding or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            codings[coding] = q
+    return codings
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised when none of the requested byte ranges overlap the file"""
+
+
+def parse_range_header(range_header: str, file_size: int):
+    """Parse a `Range: bytes=...` header into sorted, coalesced (start, end) pairs.
+
+    `end` is inclusive, as in `Content-Range`. Returns None when the header
+    should be ignored and the whole file served.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec:
+        return None
+
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, sep, last = part.partition("-")
+        if not sep:
+            return None
+        try:
+            if first.strip() == "":
+                # Suffix range: the last N bytes
+                length = int(last)
+                if length <= 0:
+                    continue
+                start, end = max(file_size - length, 0), file_size - 1
+            else:
+                start = int(first)
+                end = int(last) if last.strip() else file_size - 1
+        except ValueError:
+            return None
+        if start >= file_size:
+            continue
+        if start > end:
+            return None
+        ranges.append((start, min(end, file_size - 1)))
+
+    if not ranges:
+        raise RangeNotSatisfiable()
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    ranges.sort()
+    coalesced = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = coalesced[-1]
+        if start <= last_end + 1:
+            coalesced[-1] = (last_start, max(last_end, end))
+        else:
+            coalesced.append((start, end))
+    return coalesced
+
+
+class RangeFileResponse(Response):
+    """File response supporting single and multipart byte ranges.
+
+    The body is sent with the ASGI `http.response.zerocopysend` extension
+    (os.sendfile) when the server offers it. uvicorn does not, so under
+    start.sh and the Procfile the file is read in chunks in a worker thread
+    and copied through the event loop.
+    """
+
+    chunk_size = 256 * 1024
+
+    def __init__(self, path, stat_result: os.stat_result = None, request_headers: Headers = None, media_type: str = None, cache_control: str = None):
+        self.path = Path(path)
+        self.stat_result = stat_result or os.stat(path)
+        self.request_headers = request_headers or Headers()
+        self.media_type = media_type or mimetypes.guess_type(self.path.name)[0] or "application/octet-stream"
+        self.background = None
+        self.status_code = 200
+        self.ranges = None
+
+        file_size = self.stat_result.st_size
+        etag_base = f"{self.stat_result.st_mtime}-{file_size}"
+        self.etag = f'"{hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"'
+        self.last_modified = formatdate(self.stat_result.st_mtime, usegmt=True)
+
+        if cache_control is None:
+            cache_control = IMMUTABLE_CACHE_CONTROL if is_content_addressed(self.path.name) else MEDIA_CACHE_CONTROL
+        self.init_headers({
+            "accept-ranges": "bytes",
+            "cache-control": cache_control,
+            "etag": self.etag,
+            "last-modified": self.last_modified,
+        })
+
+        if self._is_not_modified():
+            self.status_code = 304
+            return
+
+        range_header = self.request_headers.get("range")
+        if range_header and self._if_range_matches():
+            try:
+                self.ranges = parse_range_header(range_header, file_size)
+            except RangeNotSatisfiable:
+                self.status_code = 416
+                self.headers["content-range"] = f"bytes */{file_size}"
+                self.headers["content-length"] = "0"
+                return
+
+        if not self.ranges:
+            self.ranges = None
+            self.headers["content-type"] = self.media_type
+            self.headers["content-length"] = str(file_size)
+        elif len(self.ranges) == 1:
+            start, end = self.ranges[0]
+            self.status_code = 206
+            self.headers["content-type"] = self.media_type
+            self.headers["content-range"] = f"bytes {start}-{end}/{file_size}"
+            self.headers["content-length"] = str(end - start + 1)
+        else:
+            self.status_code = 206
+            self.boundary = uuid.uuid4().hex
+            self.headers["content-type"] = f"multipart/byteranges; boundary={self.boundary}"
+            self.headers["content-length"] = str(sum(
+                len(self._part_header(start, end)) + (end - start + 1) + 2
+                for start, end in self.ranges
+            ) + len(self._closing_boundary()))
+
+    def _is_not_modified(self) -> bool:
+        if_none_match = self.request_headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or self.etag in tags
+        return self.request_headers.get("if-modified-since") == self.last_modified
+
+    def _if_range_matches(self) -> bool:
+        if_range = self.request_headers.get("if-range")
+        return if_range is None or if_range in (self.etag, self.last_modified)
+
+    def _part_header(self, start: int, end: int) -> bytes:
+        return (
+            f"--{self.boundary}\r\n"
+            f"Content-Type: {self.media_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{self.stat_result.st_size}\r\n\r\n"
+        ).encode("latin-1")
+
+    def _closing_boundary(self) -> bytes:
+        return f"--{self.boundary}--\r\n".encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if scope["method"].upper() == "HEAD" or self.status_code in (304, 416):
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        zero_copy = "http.response.zerocopysend" in scope.get("extensions", {})
+        file_size = self.stat_result.st_size
+        segments = self.ranges or [(0, file_size - 1)]
+        multipart = self.ranges is not None and len(self.ranges) > 1
+
+        f = await asyncio.to_thread(open, self.path, "rb")
+        try:
+            for start, end in segments:
+                if multipart:
+                    await send({"type": "http.response.body", "body": self._part_header(start, end), "more_body": True})
+                await self._send_segment(f, start, end - start + 1, send, zero_copy)
+                if multipart:
+                    await send({"type": "http.response.body", "body": b"\r\n", "more_body": True})
+            closing = self._closing_boundary() if multipart else b""
+            await send({"type": "http.response.body", "body": closing, "more_body": False})
+        finally:
+            await asyncio.to_thread(f.close)
+
+    async def _send_segment(self, f, offset: int, count: int, send, zero_copy: bool):
+        if count <= 0:
+            return
+        if zero_copy:
+            await send({
+                "type": "http.response.zerocopysend",
+                "file": f,
+                "offset": offset,
+                "count": count,
+                "more_body": True,
+            })
+            return
+
+        # pread leaves the file position alone, so no seek per chunk
+        fd = f.fileno()
+        while count > 0:
+            chunk = await asyncio.to_thread(os.pread, fd, min(self.chunk_size, count), offset)
+            if not chunk:
+                break
+            offset += len(chunk)
+            count -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with fingerprinted URLs, precompressed variants and Range support.
+
+    Fingerprinted paths from the static manifest are mapped back to the file
+    on disk and, like content-addressed media, cached as immutable.
+    """
+
+    async def get_response(self, path, scope):
+        original = static_manifest.original_path(Path(path).as_posix())
+        if original is not None:
+            scope["static.fingerprinted"] = True
+            path = os.path.normpath(original)
+        return await super().get_response(path, scope)
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        if status_code != 200:
+            # 404.html and friends in html mode
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        request_headers = Headers(scope=scope)
+        full_path = Path(full_path)
+        cache_control = None
+        if scope.get("static.fingerprinted") or is_content_addressed(full_path.name):
+            cache_control = IMMUTABLE_CACHE_CONTROL
+
+        if not is_compressible(full_path.name):
+            return RangeFileResponse(full_path, stat_result, request_headers, cache_control=cache_control)
+
+        media_type = mimetypes.guess_type(full_path.name)[0]
+        accepted = parse_accept_encoding(request_headers.get("accept-encoding"))
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS.items():
+            variant = full_path.with_name(full_path.name + suffix)
+            if encoding in accepted and variant.is_file():
+                response = RangeFileResponse(variant, variant.stat(), request_headers, media_type, cache_control)
+                response.headers["content-encoding"] = encoding
+                break
+        else:
+            response = RangeFileResponse(full_path, stat_result, request_headers, media_type, cache_control)
+        response.headers["vary"] = "Accept-Encoding"
+        return response
@@ -0,0 +1,79 @@
+"""
+Check that every order listing filter combination is served by an index.
+
+Runs EXPLAIN QUERY PLAN on an in-memory SQLite copy of the schema for the
+queries GET /api/orders/ builds: the orders table must never be scanned
+without an index, and filters on an indexed column plus the date range must
+come back already sorted (no temporary B-tree for the ORDER BY).
+"""
+
+from datetime import datetime
+import itertools
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+# routes needs a configured app to import; the plans come from the engine below
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("MEDIA_RECONCILE_ON_STARTUP", "false")
+
+from models import Base, Order  # noqa: E402
+from routes import ORDER_LIST_ORDER_BY, ORDER_SUMMARY_FIELDS, _order_filters, _order_projection_query  # noqa: E402
+
+FILTER_VALUES = {
+    "status": "pending",
+    "customer_id": 42,
+    "product_id": 3,
+    "date_from": datetime(2024, 1, 1),
+    "date_to": datetime(2024, 2, 1),
+    "min_total": 1000.0,
+    "max_total": 5000.0,
+}
+# Filters that lead a (column, order_date, id) index
+SORTED_BY_INDEX = {"status", "customer_id", "product_id", "date_from", "date_to"}
+
+FILTER_COMBINATIONS = [
+    combination
+    for size in range(len(FILTER_VALUES) + 1)
+    for combination in itertools.combinations(FILTER_VALUES, size)
+]
+
+
+@pytest.fixture(scope="module")
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        yield session
+
+
+def query_plan(db, query) -> list:
+    sql = str(query.statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+    return [row[3] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def check_plan(plan: list, combination: tuple):
+    orders_steps = [step for step in plan if step.split()[1:2] == ["orders"]]
+    assert orders_steps, plan
+    for step in orders_steps:
+        assert "USING INDEX" in step or "USING INTEGER PRIMARY KEY" in step, f"{combination}: {plan}"
+    if set(combination) <= SORTED_BY_INDEX:
+        assert not any("TEMP B-TREE FOR ORDER BY" in step for step in plan), f"{combination}: {plan}"
+
+
+@pytest.mark.parametrize("combination", FILTER_COMBINATIONS, ids=lambda combination: "+".join(combination) or "none")
+def test_full_view_uses_index(db, combination):
+    filters = _order_filters(**{name: FILTER_VALUES[name] for name in combination})
+    query = db.query(Order).filter(*filters).order_by(*ORDER_LIST_ORDER_BY).limit(100)
+    check_plan(query_plan(db, query), combination)
+
+
+@pytest.mark.parametrize("combination", FILTER_COMBINATIONS, ids=lambda combination: "+".join(combination) or "none")
+def test_summary_view_uses_index(db, combination):
+    filters = _order_filters(**{name: FILTER_VALUES[name] for name in combination})
+    query = _order_projection_query(db, ORDER_SUMMARY_FIELDS).filter(*filters).order_by(*ORDER_LIST_ORDER_BY).limit(100)
+    check_plan(query_plan(db, query), combination)